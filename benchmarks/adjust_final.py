@@ -0,0 +1,73 @@
+"""
+Compare the row-wise enforce_grade against the vectorized enforce_grades
+
+Score sheets have float, integer and nullable integer scores with missing
+scores and indexes. Both versions must give the same Series (values, NA
+positions and dtype) before they are timed, the time is the best of several
+runs.
+
+    python benchmarks/adjust_final.py [--repeat 3] [--json results.json]
+"""
+
+import numpy as np
+import pandas as pd
+
+from otomasi.grading.adjust_final import enforce_grade, enforce_grades
+from harness import benchmark_parser, best_time, report
+
+THRESHOLDS = {"A": 100, "AB": 80, "B": 73, "BC": 67, "C": 60, "D": 50, "E": 40}
+SIZES = [1_000, 10_000, 100_000]
+SCORE_KINDS = ["float", "int", "Int64"]
+
+
+def make_scores(n_rows: int, kind: str, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    missing = rng.random(n_rows) < 0.02
+    match kind:
+        case "float":
+            scores = rng.uniform(30, 100, n_rows).round(2)
+            scores[missing] = np.nan
+        case "int":
+            scores = rng.integers(30, 101, n_rows)
+        case _:
+            scores = pd.array(rng.integers(30, 101, n_rows), dtype="Int64")
+            scores[missing] = pd.NA
+    indexes = np.array(list(THRESHOLDS), dtype=object)[rng.integers(0, 7, n_rows)]
+    indexes[rng.random(n_rows) < 0.01] = None
+    nims = [f"{16520000 + i}" for i in range(n_rows)]
+    return pd.DataFrame({"NIM": nims, "NA": scores, "Indeks": indexes})
+
+
+def row_wise(df: pd.DataFrame) -> pd.Series:
+    return df.apply(lambda x: enforce_grade(x, THRESHOLDS, "NA", "Indeks"), axis=1)
+
+
+def vectorized(df: pd.DataFrame) -> pd.Series:
+    return enforce_grades(df, THRESHOLDS, "NA", "Indeks")
+
+
+def main():
+    args = benchmark_parser(__doc__).parse_args()
+
+    results = []
+    for n_rows in SIZES:
+        for kind in SCORE_KINDS:
+            df = make_scores(n_rows, kind)
+            pd.testing.assert_series_equal(row_wise(df), vectorized(df))
+            row_ms = best_time(lambda: row_wise(df), args.repeat)
+            vectorized_ms = best_time(lambda: vectorized(df), args.repeat)
+            results.append(
+                {
+                    "rows": n_rows,
+                    "scores": kind,
+                    "row-wise ms": row_ms,
+                    "vectorized ms": vectorized_ms,
+                    "speedup": row_ms / vectorized_ms,
+                }
+            )
+
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
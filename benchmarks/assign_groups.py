@@ -0,0 +1,80 @@
+"""
+Compare the greedy and optimal mentoring group strategies
+
+Synthetic cohorts have faculties of uneven sizes, so every faculty leaves a
+remainder to be combined. For each strategy the table reports the groups
+made, the undersized groups, the groups mixing several faculties and the
+best time of several runs, summed over a few cohorts per size. Every cohort
+checks that the optimal strategy doesn't leave more undersized groups than
+greedy, nor mix more faculties when both leave as many undersized groups.
+
+    python benchmarks/assign_groups.py [--repeat 3] [--cohorts 3] [--json results.json]
+"""
+
+from otomasi.mentoring.assign_groups import (
+    GroupStrategy,
+    _standardize_columns,
+    create_groups,
+)
+from harness import benchmark_parser, best_time, report
+from synthetic import students_frame
+
+STUDENTS = [1_000, 5_000, 10_000]
+# (group_size, min_size)
+SIZES = [(10, 7), (8, 6), (12, 10)]
+
+
+def main():
+    parser = benchmark_parser(__doc__, repeat_help="runs per cohort")
+    parser.add_argument("--cohorts", type=int, default=3, help="cohorts per size")
+    args = parser.parse_args()
+
+    results = []
+    for students in STUDENTS:
+        cohorts = [
+            _standardize_columns(students_frame(students, seed))
+            for seed in range(args.cohorts)
+        ]
+        for group_size, min_size in SIZES:
+            rows = {
+                strategy: {
+                    "students": students,
+                    "size": f"{min_size}-{group_size}",
+                    "strategy": str(strategy),
+                    "groups": 0,
+                    "undersized": 0,
+                    "mixed": 0,
+                    "time_ms": 0.0,
+                }
+                for strategy in GroupStrategy
+            }
+            for cohort in cohorts:
+                counts = {}
+                for strategy, row in rows.items():
+
+                    def run():
+                        l_groups, p_groups = create_groups(
+                            cohort, group_size, min_size, strategy
+                        )
+                        return l_groups + p_groups
+
+                    groups = run()
+                    assert sum(map(len, groups)) == len(cohort)
+                    undersized = sum(len(g) < min_size for g in groups)
+                    mixed = sum(g["FAKULTAS"].nunique() > 1 for g in groups)
+                    counts[strategy] = (undersized, mixed)
+                    row["groups"] += len(groups)
+                    row["undersized"] += undersized
+                    row["mixed"] += mixed
+                    row["time_ms"] += best_time(run, args.repeat)
+                # optimal never mixes more faculties for the same undersized groups
+                optimal = counts[GroupStrategy.OPTIMAL]
+                greedy = counts[GroupStrategy.GREEDY]
+                assert optimal[0] < greedy[0] or optimal <= greedy, (optimal, greedy)
+            results.extend(rows.values())
+
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
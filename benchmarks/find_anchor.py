@@ -0,0 +1,85 @@
+"""
+Compare find_anchor against the previous df.eq based implementation
+
+Synthetic sheets mimic DPK/mentor exports: a short text preamble, the anchor
+row, then a wide table of mixed text, numbers and blanks. Time is the best of
+several runs, memory is the tracemalloc peak of a single call.
+
+    python benchmarks/find_anchor.py [--repeat 5] [--json results.json]
+"""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from otomasi.utilities.xlsx import AnchorMatch, find_anchor
+from harness import benchmark_parser, best_time, report
+
+ANCHOR = "NO"
+# (rows, columns, anchor row)
+SHAPES = [
+    (1_000, 50, 8),
+    (10_000, 200, 8),
+    (50_000, 200, 8),
+    (10_000, 200, 9_000),
+]
+
+
+def legacy_find_anchor(df: pd.DataFrame, anchor: str):
+    anchor_loc = df[df.eq(anchor)].dropna(axis=1, how="all").dropna(how="all")
+    return (anchor_loc.index.item(), df.columns.get_loc(anchor_loc.columns.item()))
+
+
+def make_sheet(n_rows: int, n_cols: int, anchor_row: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 100, (n_rows, n_cols)).astype(object)
+    data[rng.random((n_rows, n_cols)) < 0.2] = np.nan
+    data[:, 1] = [f"1652{i:04d}" for i in range(n_rows)]
+    data[:anchor_row, :] = np.nan
+    data[:anchor_row, 0] = "preamble"
+    data[anchor_row, :] = [f"H{i}" for i in range(n_cols)]
+    data[anchor_row, 2] = ANCHOR
+    return pd.DataFrame(data)
+
+
+def measure(func, repeat: int) -> tuple[float, float]:
+    best_ms = best_time(func, repeat)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best_ms, peak / 1024**2
+
+
+def main():
+    args = benchmark_parser(__doc__, repeat=5).parse_args()
+
+    implementations = {
+        "legacy df.eq": lambda df: legacy_find_anchor(df, ANCHOR),
+        "find_anchor first": lambda df: find_anchor(df, ANCHOR),
+        "find_anchor error": lambda df: find_anchor(
+            df, ANCHOR, on_multiple=AnchorMatch.ERROR
+        ),
+    }
+    results = []
+    for n_rows, n_cols, anchor_row in SHAPES:
+        df = make_sheet(n_rows, n_cols, anchor_row)
+        expected = legacy_find_anchor(df, ANCHOR)
+        for name, impl in implementations.items():
+            assert impl(df) == expected, name
+            time_ms, peak_mb = measure(lambda: impl(df), args.repeat)
+            results.append(
+                {
+                    "shape": f"{n_rows}x{n_cols} @{anchor_row}",
+                    "implementation": name,
+                    "time_ms": time_ms,
+                    "peak_mb": peak_mb,
+                }
+            )
+
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
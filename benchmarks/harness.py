@@ -0,0 +1,46 @@
+"""
+Timing, command line and reporting helpers shared by the benchmark scripts
+"""
+
+import json
+import time
+from argparse import ArgumentParser
+
+from tabulate import tabulate
+
+
+def best_time(func, repeat: int) -> float:
+    """Best wall time of repeat calls of func, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark_parser(
+    doc: str, repeat: int | None = 3, repeat_help: str = "runs per case"
+) -> ArgumentParser:
+    """
+    Parser described by the first line of doc, with the --json option
+
+    --repeat is added too, with repeat as its default, unless repeat is None.
+    """
+    parser = ArgumentParser(description=doc.strip().splitlines()[0])
+    if repeat is not None:
+        parser.add_argument("--repeat", type=int, default=repeat, help=repeat_help)
+    parser.add_argument("--json", type=str, help="dump the results as JSON")
+    return parser
+
+
+def report(results: list[dict], json_path: str | None = None, floatfmt=".2f"):
+    """Print results as a table, and dump them to json_path if given"""
+    print(tabulate(results, headers="keys", floatfmt=floatfmt))
+    if json_path:
+        dump_json(results, json_path)
+
+
+def dump_json(results, json_path: str):
+    with open(json_path, "w") as f:
+        json.dump(results, f, indent=2)
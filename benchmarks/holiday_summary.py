@@ -0,0 +1,147 @@
+"""
+Compare the holiday_summary schedule and holiday steps against their row-wise versions
+
+Schedules range from the sample semester of schedule_template.json to
+multi-year calendars of hundreds of parallel classes, filtered against
+national plus institutional holiday lists with overlapping ranges. Both
+versions must give equal DataFrames before they are timed, the time is the
+best of several runs.
+
+    python benchmarks/holiday_summary.py [--repeat 3] [--json results.json]
+"""
+
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from otomasi.calendar.holiday_summary import (
+    Days,
+    filter_holidays,
+    format_list_in_csv,
+    generate_schedule,
+)
+from harness import benchmark_parser, best_time, report
+
+START_DATE = datetime(2025, 2, 17)
+# (weeks, classes, holidays)
+SHAPES = [
+    (16, 6, 10),
+    (16, 100, 50),
+    (52, 100, 200),
+    (52, 300, 200),
+    (208, 300, 800),
+]
+
+
+def legacy_generate_schedule(
+    start_date: datetime, week_count: int, class_schedule: dict[str, str]
+) -> pd.DataFrame:
+    seed = {
+        "minggu": [i for i in range(1, week_count + 1)],
+        "week_start": [
+            (start_date + timedelta(days=(7 * i))) for i in range(week_count)
+        ],
+    }
+    schedule = pd.DataFrame(seed)
+    # inserting hundreds of columns one by one fragments the frame
+    warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+    for class_name, class_day in class_schedule.items():
+        day_diff = timedelta(days=Days[class_day].value)
+        schedule[class_name] = schedule.apply(lambda x: x.week_start + day_diff, axis=1)
+
+    schedule.drop("week_start", axis=1, inplace=True)
+    return schedule
+
+
+def legacy_filter_holidays(
+    schedule: pd.DataFrame, holidays: pd.DataFrame, class_cols: list[str]
+) -> pd.DataFrame:
+    warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+    for col in class_cols:
+        schedule[f"{col}_holiday"] = schedule[col].apply(
+            lambda x: format_list_in_csv(
+                holidays.loc[
+                    (holidays["start"] <= x) & (holidays["end"] >= x), "detail"
+                ].values
+            )
+        )
+
+    return schedule
+
+
+def make_class_schedule(classes: int, seed: int = 0) -> dict[str, str]:
+    rng = np.random.default_rng(seed)
+    days = [day.name for day in Days]
+    return {f"K{idx + 1:02d}": days[rng.integers(5)] for idx in range(classes)}
+
+
+def make_holidays(holidays: int, weeks: int, seed: int = 0) -> pd.DataFrame:
+    """Holidays of one to ten days, overlapping each other, a few without an end"""
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp(START_DATE) + pd.to_timedelta(
+        rng.integers(-30, 7 * weeks + 30, holidays), unit="D"
+    )
+    ends = starts + pd.to_timedelta(rng.integers(0, 10, holidays), unit="D")
+    holiday_list = pd.DataFrame(
+        {
+            "start": starts,
+            "end": ends,
+            "detail": [f"Libur {idx + 1}" for idx in range(holidays)],
+        }
+    )
+    holiday_list.loc[rng.random(holidays) < 0.02, "end"] = pd.NaT
+    return holiday_list
+
+
+def compare(step: str, shape: dict, legacy, current, repeat: int) -> dict:
+    pd.testing.assert_frame_equal(legacy(), current())
+    legacy_ms = best_time(legacy, repeat)
+    current_ms = best_time(current, repeat)
+    return {
+        "step": step,
+        **shape,
+        "row-wise ms": legacy_ms,
+        "vectorized ms": current_ms,
+        "speedup": legacy_ms / current_ms,
+    }
+
+
+def main():
+    args = benchmark_parser(__doc__).parse_args()
+
+    results = []
+    for weeks, classes, holidays in SHAPES:
+        shape = {"weeks": weeks, "classes": classes, "holidays": holidays}
+        class_schedule = make_class_schedule(classes)
+        holiday_list = make_holidays(holidays, weeks)
+        schedule = generate_schedule(START_DATE, weeks, class_schedule)
+        class_cols = list(class_schedule)
+
+        results.append(
+            compare(
+                "generate_schedule",
+                shape,
+                lambda: legacy_generate_schedule(START_DATE, weeks, class_schedule),
+                lambda: generate_schedule(START_DATE, weeks, class_schedule),
+                args.repeat,
+            )
+        )
+        results.append(
+            compare(
+                "filter_holidays",
+                shape,
+                lambda: legacy_filter_holidays(
+                    schedule.copy(), holiday_list, class_cols
+                ),
+                lambda: filter_holidays(schedule, holiday_list, class_cols),
+                args.repeat,
+            )
+        )
+
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
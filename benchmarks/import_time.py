@@ -0,0 +1,94 @@
+"""
+Measure the cold start cost of the otomasi CLI with ``python -X importtime``
+
+Each measurement runs in a fresh interpreter. For every subcommand, ``--help``
+shows what parsing the command line costs, while the implementation import
+shows what the subcommand pays once its main() runs. The eager row imports
+every implementation module up front, which is what every invocation paid
+before subcommands were loaded lazily.
+
+Run from the repository root with otomasi installed (``pip install -e .``):
+
+    python benchmarks/import_time.py [--repeat 5] [--json results.json]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from tabulate import tabulate
+
+from harness import benchmark_parser, dump_json
+
+SUBCOMMAND_MODULES = {
+    "holiday": "otomasi.calendar.holiday_summary",
+    "zoom-attendance": "otomasi.attendance.zoom_attendance",
+    "groups": "otomasi.mentoring.assign_groups",
+    "journeys-compile": "otomasi.mentoring.journeys_compile",
+    "journal": "otomasi.mentoring.journal_screener",
+    "compile": "otomasi.grading.compile",
+    "dpk": "otomasi.grading.dpk",
+    "adjust-score": "otomasi.grading.adjust_final",
+}
+
+
+def import_time_us(stderr: str) -> int:
+    """Sum the cumulative import time (us) of the top level imports"""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented, their time is already in the parent
+        if name.startswith("  "):
+            continue
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            total += int(cumulative)
+    return total
+
+
+def measure(argv: list[str], repeat: int) -> dict:
+    imports = []
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *argv],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        walls.append(time.perf_counter() - start)
+        imports.append(import_time_us(proc.stderr))
+    return {
+        "import_ms": statistics.median(imports) / 1000,
+        "wall_ms": statistics.median(walls) * 1000,
+    }
+
+
+def main():
+    args = benchmark_parser(__doc__, repeat=5).parse_args()
+
+    cases = {"--help": ["-m", "otomasi", "--help"]}
+    for command, module in SUBCOMMAND_MODULES.items():
+        cases[f"{command} --help"] = ["-m", "otomasi", command, "--help"]
+        cases[f"{command} main()"] = ["-c", f"import otomasi.cli, {module}"]
+    eager = ", ".join(["otomasi.cli", *SUBCOMMAND_MODULES.values()])
+    cases["eager (all modules)"] = ["-c", f"import {eager}"]
+
+    results = {name: measure(argv, args.repeat) for name, argv in cases.items()}
+    print(
+        tabulate(
+            [[name, r["import_ms"], r["wall_ms"]] for name, r in results.items()],
+            headers=["case", "import (ms)", "wall (ms)"],
+            floatfmt=".1f",
+        )
+    )
+    if args.json:
+        dump_json(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
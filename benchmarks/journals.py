@@ -0,0 +1,56 @@
+"""
+Measure journal screener throughput on a synthetic journal directory
+
+The directory is generated once (or reused with --dir) and screened without
+the manifest, so every run parses every file.
+
+    python benchmarks/journals.py [--students 500] [--weeks 10] [--jobs 0 1 4]
+"""
+
+import os
+import tempfile
+import time
+
+from otomasi.mentoring import journal_screener
+from harness import benchmark_parser, report
+from synthetic import generate_journals
+
+
+def main():
+    parser = benchmark_parser(__doc__, repeat=None)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=10)
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[1, 0], help="worker counts to compare"
+    )
+    parser.add_argument("--dir", type=str, help="journal directory to generate/reuse")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.dir or os.path.join(tmp, "journals")
+        if not os.path.isdir(directory) or not os.listdir(directory):
+            start = time.perf_counter()
+            count = generate_journals(directory, args.students, args.weeks)
+            print(f"generated {count} journals in {time.perf_counter() - start:.1f} s")
+        count = len(os.listdir(directory))
+
+        results = []
+        for jobs in args.jobs:
+            output = os.path.join(tmp, f"result_{jobs}.xlsx")
+            start = time.perf_counter()
+            journal_screener.main(directory, output, jobs, use_manifest=False)
+            elapsed = time.perf_counter() - start
+            results.append(
+                {
+                    "files": count,
+                    "jobs": jobs,
+                    "seconds": elapsed,
+                    "files_per_second": count / elapsed,
+                }
+            )
+
+    report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Time every otomasi subcommand end to end on synthetic data
+
+Inputs are generated once per scale into the work directory and reused by
+later runs, so the numbers of different commits are measured on the same
+files. Each subcommand's main is called in-process with profiling enabled,
+to split its time into the read, (anchor) extract, transform and write
+stages. The parsed file cache is disabled unless --cache is given.
+
+    python benchmarks/suite.py [--scales 1k 10k] [--commands groups dpk]
+        [--repeat 3] [--json results.json] [--compare baseline.json]
+
+Scales are numbers of students: 1k, 10k and 100k. Derived sizes are one DPK
+workbook per 50 students, one mentor workbook per 20 students, one to four
+Zoom report rows per student, one class per 50 students over a 52 week
+semester, and one journal per 10 students (ten weeks of students/100).
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+
+from tabulate import tabulate
+
+import synthetic
+from harness import benchmark_parser, dump_json
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+DEFAULT_WORKDIR = os.path.join("benchmarks", ".data")
+STAGES = ("read", "extract", "transform", "write")
+
+
+def generate_inputs(directory: str, students: int):
+    """Generate the inputs of every subcommand, unless already done"""
+    marker = os.path.join(directory, ".complete")
+    if os.path.exists(marker):
+        return
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    synthetic.write_student_list(os.path.join(directory, "students.xlsx"), students)
+    synthetic.write_compile_inputs(os.path.join(directory, "compile"), students)
+    synthetic.write_dpk_workbooks(os.path.join(directory, "dpk"), students)
+    synthetic.write_mentor_workbooks(os.path.join(directory, "mentors"), students)
+    synthetic.write_zoom_report(os.path.join(directory, "zoom.csv"), students)
+    synthetic.write_holiday_inputs(
+        os.path.join(directory, "holiday"), max(1, students // 50)
+    )
+    synthetic.write_final_scores(os.path.join(directory, "scores"), students)
+    synthetic.generate_journals(
+        os.path.join(directory, "journals"), max(1, students // 100), weeks=10
+    )
+    open(marker, "w").close()
+    print(
+        f"generated inputs of {students} students in {time.perf_counter() - start:.1f} s"
+    )
+
+
+def run_groups(data: str, out: str, jobs: int):
+    from otomasi.mentoring import assign_groups
+
+    assign_groups.main([os.path.join(data, "students.xlsx")], out, 10, 7)
+
+
+def run_compile(data: str, out: str, jobs: int):
+    from otomasi.grading import compile
+
+    compile.main(
+        os.path.join(data, "compile", "master.csv"),
+        [os.path.join(data, "compile", "tugas_*.csv")],
+        f"{out}.csv",
+        "NIM",
+        jobs=jobs,
+    )
+
+
+def run_dpk(data: str, out: str, jobs: int):
+    from otomasi.grading import dpk
+
+    dpk.main([os.path.join(data, "dpk", "*.xlsx")], f"{out}.csv", jobs)
+
+
+def run_journeys(data: str, out: str, jobs: int):
+    from otomasi.mentoring import journeys_compile
+
+    journeys_compile.main(
+        [os.path.join(data, "mentors", "*.xlsx")], "NIM", f"{out}.csv", jobs
+    )
+
+
+def run_zoom(data: str, out: str, jobs: int):
+    from otomasi.attendance import zoom_attendance
+
+    zoom_attendance.main(os.path.join(data, "zoom.csv"), f"{out}.csv")
+
+
+def run_holiday(data: str, out: str, jobs: int):
+    from otomasi.calendar import holiday_summary
+    from otomasi.utilities.formats import DfOutFormat
+
+    seed_file = os.path.join(data, "holiday", "seed.json")
+    with open(os.path.join(data, "holiday", "holidays.csv")) as holiday_file:
+        holiday_summary.main([seed_file], holiday_file, out, DfOutFormat.CSV, False)
+
+
+def run_adjust(data: str, out: str, jobs: int):
+    from otomasi.grading import adjust_final
+
+    with open(os.path.join(data, "scores", "grades.json")) as grade_config:
+        adjust_final.main(
+            [os.path.join(data, "scores", "scores.xlsx")],
+            grade_config,
+            "NA",
+            "Indeks",
+            f"{out}.xlsx",
+        )
+
+
+def run_journal(data: str, out: str, jobs: int):
+    from otomasi.mentoring import journal_screener
+
+    journal_screener.main(
+        os.path.join(data, "journals"), f"{out}.xlsx", jobs, use_manifest=False
+    )
+
+
+COMMANDS = {
+    "groups": run_groups,
+    "compile": run_compile,
+    "dpk": run_dpk,
+    "journeys-compile": run_journeys,
+    "zoom-attendance": run_zoom,
+    "holiday": run_holiday,
+    "adjust-score": run_adjust,
+    "journal": run_journal,
+}
+
+
+def measure(command: str, data: str, out: str, jobs: int) -> dict[str, float]:
+    from otomasi.utilities import profiling
+
+    # tracemalloc would slow the commands down, only the stage times are kept
+    profiling.enable(trace_memory=False)
+    try:
+        start = time.perf_counter()
+        # the commands report progress on stdout/stderr, keep the table readable
+        with (
+            contextlib.redirect_stdout(io.StringIO()),
+            contextlib.redirect_stderr(io.StringIO()),
+        ):
+            COMMANDS[command](data, out, jobs)
+        total = time.perf_counter() - start
+    finally:
+        profile = profiling.disable()
+    stages = profile.totals()
+    return {
+        "total": total,
+        **{name: stages.get(name, 0.0) for name in STAGES},
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline_file: str) -> list[dict]:
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    previous = {(r["scale"], r["command"]): r for r in baseline["results"]}
+    rows = []
+    for result in results:
+        before = previous.get((result["scale"], result["command"]))
+        if before is None:
+            continue
+        rows.append(
+            {
+                "scale": result["scale"],
+                "command": result["command"],
+                "baseline (s)": before["total"],
+                "current (s)": result["total"],
+                "speedup": before["total"] / result["total"],
+            }
+        )
+    return rows
+
+
+def main():
+    parser = benchmark_parser(
+        __doc__, repeat_help="runs per command, the fastest is kept"
+    )
+    parser.add_argument(
+        "--scales", nargs="+", choices=list(SCALES), default=["1k", "10k"]
+    )
+    parser.add_argument(
+        "--commands", nargs="+", choices=list(COMMANDS), default=list(COMMANDS)
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes of the commands supporting -j",
+    )
+    parser.add_argument("--workdir", type=str, default=DEFAULT_WORKDIR)
+    parser.add_argument(
+        "--cache", action="store_true", help="keep the parsed file cache enabled"
+    )
+    parser.add_argument(
+        "--compare", type=str, help="JSON results of a previous run to compare with"
+    )
+    args = parser.parse_args()
+
+    from otomasi.utilities import cache
+
+    cache.configure(enabled=args.cache)
+
+    results = []
+    for scale in args.scales:
+        data = os.path.join(args.workdir, scale)
+        generate_inputs(data, SCALES[scale])
+        out_dir = os.path.join(args.workdir, "out", scale)
+        os.makedirs(out_dir, exist_ok=True)
+        for command in args.commands:
+            runs = [
+                measure(command, data, os.path.join(out_dir, command), args.jobs)
+                for _ in range(args.repeat)
+            ]
+            best = min(runs, key=lambda run: run["total"])
+            results.append({"scale": scale, "command": command, **best})
+            print(f"{scale:>5} {command:<17} {best['total']:8.2f} s")
+
+    print(tabulate(results, headers="keys", floatfmt=".3f"))
+    if args.compare:
+        print(tabulate(compare(results, args.compare), headers="keys", floatfmt=".3f"))
+    if args.json:
+        dump_json(
+            {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "repeat": args.repeat,
+                "jobs": args.jobs,
+                "results": results,
+            },
+            args.json,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Synthetic inputs for the otomasi benchmarks
+
+Every generator is deterministic for a given seed, so results of different
+commits are measured against the same data.
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+import pandas as pd
+from docx import Document
+from openpyxl import Workbook
+
+WORDS = (
+    "kasih damai sukacita iman pengharapan doa firman tuhan hidup berkat syukur "
+    "anugerah hari ini saya belajar bahwa dalam setiap keadaan kita dipanggil "
+    "untuk setia melayani sesama dengan rendah hati dan penuh kesabaran"
+).split()
+HEADERS = ["Pokok Doa", "Refleksi", "Aplikasi"]
+MONTHS = ["Sep", "Okt", "Nov", "Des"]
+
+FACULTIES = {
+    "FMIPA": ["MA", "FI", "KI", "AS"],
+    "SITH": ["BI", "MK"],
+    "SF": ["FA", "FK"],
+    "FITB": ["GL", "GD", "ME", "OS"],
+    "FTTM": ["TA", "TM", "TG"],
+    "STEI": ["IF", "EL", "STI", "ET"],
+    "FTSL": ["SI", "TL", "KL"],
+    "FTI": ["TK", "TI", "TF"],
+    "FTMD": ["MS", "AE", "MT"],
+    "SAPPK": ["AR", "PL"],
+    "FSRD": ["SR", "DK", "KR"],
+    "SBM": ["MB", "MK"],
+}
+GRADE_THRESHOLDS = {"A": 100, "AB": 80, "B": 73, "BC": 67, "C": 60, "D": 50, "E": 40}
+DAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat"]
+
+
+def random_text(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def generate_journals(
+    directory: str,
+    students: int = 500,
+    weeks: int = 10,
+    seed: int = 0,
+    duplicate_rate: float = 0.05,
+    low_word_rate: float = 0.1,
+    invalid_rate: float = 0.01,
+) -> int:
+    """
+    Write a directory of small DOCX journals, one per student per week
+
+    Some journals are exact copies of the student's previous week, some are
+    too short and some have an invalid filename, so every screener check has
+    work to do. Returns the number of files written.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for student in range(students):
+        student_id = f"{16520000 + student}"
+        name = f"Mahasiswa {student}"
+        previous = None
+        for week in range(weeks):
+            date = f"{1 + (week * 7) % 28} {MONTHS[(week * 7) // 28 % len(MONTHS)]}"
+            if previous is not None and rng.random() < duplicate_rate:
+                paragraphs = previous
+            else:
+                n_words = 30 if rng.random() < low_word_rate else rng.randint(80, 250)
+                paragraphs = [
+                    text
+                    for header in HEADERS
+                    for text in (header, random_text(rng, n_words // len(HEADERS)))
+                ]
+            previous = paragraphs
+
+            document = Document()
+            for paragraph in paragraphs:
+                document.add_paragraph(paragraph)
+            if rng.random() < invalid_rate:
+                filename = f"jurnal {student} minggu {week}.docx"
+            else:
+                filename = f"{student_id}_{name}_{date}.docx"
+            document.save(os.path.join(directory, filename))
+            count += 1
+    return count
+
+
+def nims(students: int) -> list[str]:
+    return [f"{16520000 + i}" for i in range(students)]
+
+
+def students_frame(students: int, seed: int = 0) -> pd.DataFrame:
+    """Student list with the columns expected by the groups command"""
+    rng = np.random.default_rng(seed)
+    faculties = list(FACULTIES)
+    faculty = rng.choice(faculties, students, p=_faculty_weights(rng, len(faculties)))
+    prodi = [f"{fak}-{rng.choice(FACULTIES[fak])}" for fak in faculty]
+    return pd.DataFrame(
+        {
+            "NO": np.arange(1, students + 1),
+            "NIM": nims(students),
+            "NAMA": [f"Mahasiswa {i}" for i in range(students)],
+            "JK": rng.choice(["L", "P"], students),
+            "FAKULTAS": faculty,
+            "PRODI": prodi,
+        }
+    )
+
+
+def _faculty_weights(rng: np.random.Generator, count: int) -> np.ndarray:
+    # uneven faculty sizes leave remainders of every size for the distributor
+    weights = rng.uniform(0.5, 2.0, count)
+    return weights / weights.sum()
+
+
+def write_compile_inputs(directory: str, students: int, files: int = 4, seed: int = 0):
+    """Master student list and partial score files sharing the NIM column"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    master = pd.DataFrame(
+        {"NIM": nims(students), "NAMA": [f"Mahasiswa {i}" for i in range(students)]}
+    )
+    master.to_csv(os.path.join(directory, "master.csv"), index=False)
+    for idx in range(files):
+        # every file misses a few students, like late graders
+        present = rng.random(students) < 0.95
+        scores = pd.DataFrame(
+            {
+                "NIM": master["NIM"][present],
+                f"Tugas {idx + 1}": rng.integers(0, 101, present.sum()),
+            }
+        ).sample(frac=1, random_state=seed + idx)
+        scores.to_csv(os.path.join(directory, f"tugas_{idx + 1}.csv"), index=False)
+
+
+def write_dpk_workbooks(
+    directory: str, students: int, class_size: int = 50, seed: int = 0
+):
+    """One DPK (class participant list) workbook per class"""
+    os.makedirs(directory, exist_ok=True)
+    all_nims = nims(students)
+    for kelas, start in enumerate(range(0, students, class_size), start=1):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("DPK")
+        sheet.append(["DAFTAR PESERTA KULIAH"])
+        sheet.append(["Semester 2 - 2024/2025"])
+        sheet.append(["WI2012 Pengantar Pendidikan Agama"])
+        sheet.append(["Dosen: Dosen Pengampu"])
+        sheet.append([f"No Kelas: {kelas % 100:02d}"])
+        sheet.append([])
+        sheet.append(["NO", "NIM", "NAMA"])
+        for no, nim in enumerate(all_nims[start : start + class_size], start=1):
+            sheet.append([no, nim, f"Mahasiswa {int(nim) - 16520000}"])
+        workbook.save(os.path.join(directory, f"dpk_{kelas:04d}.xlsx"))
+
+
+def write_mentor_workbooks(
+    directory: str, students: int, group_size: int = 20, seed: int = 0
+):
+    """One mentor grading workbook per mentoring group, with two header rows"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    all_nims = nims(students)
+    for mentor, start in enumerate(range(0, students, group_size), start=1):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Nilai")
+        sheet.append(["Penilaian Mentor Journeys"])
+        sheet.append([f"Mentor {mentor}"])
+        sheet.append([])
+        sheet.append(["NO", "NIM", "Nama", "Kehadiran", None, "Nilai"])
+        sheet.append([None, None, None, "Sesi 1", "Sesi 2", "Akhir"])
+        for no, nim in enumerate(all_nims[start : start + group_size], start=1):
+            attendance = rng.choice(["H", "A"], 2, p=[0.9, 0.1]).tolist()
+            sheet.append(
+                [no, nim, f"Mahasiswa {int(nim) - 16520000}", *attendance]
+                + [int(rng.integers(50, 101))]
+            )
+        workbook.save(os.path.join(directory, f"mentor_{mentor:04d}.xlsx"))
+
+
+def write_zoom_report(path: str, students: int, seed: int = 0):
+    """Zoom participant report, students rejoin so most have several rows"""
+    rng = np.random.default_rng(seed)
+    rejoins = rng.integers(1, 5, students)
+    student = np.repeat(np.arange(students), rejoins)
+    names = [
+        f"{16520000 + i}_Mahasiswa {i}" if i % 50 else f"Sit In - Mahasiswa {i}"
+        for i in student
+    ]
+    report = pd.DataFrame(
+        {
+            "Name (original name)": names,
+            "User Email": [f"{i}@mahasiswa.itb.ac.id" for i in student],
+            "Total duration (minutes)": rng.integers(1, 100, len(student)),
+            "Guest": "Yes",
+        }
+    ).sample(frac=1, random_state=seed)
+    report.to_csv(path, index=False)
+
+
+def write_holiday_inputs(
+    directory: str,
+    classes: int,
+    weeks: int = 52,
+    holidays: int = 200,
+    seed: int = 0,
+):
+    """Schedule seed and holiday list of a long semester with many classes"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    seed_data = {
+        "start_date": "2025-02-17",
+        "class_schedule": {
+            f"K{idx + 1:02d}": DAYS[rng.integers(len(DAYS))] for idx in range(classes)
+        },
+        "week_count": weeks,
+    }
+    with open(os.path.join(directory, "seed.json"), "w") as f:
+        json.dump(seed_data, f, indent=4)
+
+    # overlapping holidays of one to ten days around the semester
+    starts = pd.Timestamp("2025-01-01") + pd.to_timedelta(
+        np.sort(rng.integers(0, 7 * weeks + 60, holidays)), unit="D"
+    )
+    ends = starts + pd.to_timedelta(rng.integers(0, 10, holidays), unit="D")
+    pd.DataFrame(
+        {
+            "start": starts.strftime("%Y-%m-%d"),
+            "end": ends.strftime("%Y-%m-%d"),
+            "detail": [f"Libur {idx + 1}" for idx in range(holidays)],
+        }
+    ).to_csv(os.path.join(directory, "holidays.csv"), index=False)
+
+
+def write_final_scores(directory: str, students: int, seed: int = 0):
+    """Final score sheet with its grade index, and the grade threshold config"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    scores = rng.uniform(30, 100, students).round(2)
+    indexes = np.array(list(GRADE_THRESHOLDS))[rng.integers(0, 7, students)]
+    frame = pd.DataFrame({"NIM": nims(students), "NA": scores, "Indeks": indexes})
+    # some students have no final score yet
+    frame.loc[rng.random(students) < 0.02, "NA"] = np.nan
+    frame.to_excel(os.path.join(directory, "scores.xlsx"), index=False)
+    with open(os.path.join(directory, "grades.json"), "w") as f:
+        json.dump(GRADE_THRESHOLDS, f, indent=4)
+
+
+def write_student_list(path: str, students: int, seed: int = 0):
+    """Student list of the groups command"""
+    students_frame(students, seed).to_excel(path, index=False)
@@ -3,6 +3,7 @@ from typing import Iterable
 
 import pandas as pd
 
+from otomasi.utilities import profiling
 from otomasi.utilities.files import read_df, write_df
 
 SPLIT_DELIMS = ["_", "-", " "]
@@ -36,8 +37,7 @@ def is_sit_in(x: str):
         return None
 
 
-def main(filename: str, out: str, threshold: int = 80):
-    df: pd.DataFrame = read_df(filename)
+def summarize_attendance(df: pd.DataFrame, threshold: int = 80) -> pd.DataFrame:
     # Filter column based on the type of file exported from Zoom report
     duration_col_name = get_duration_column(df.columns)
 
@@ -64,5 +64,17 @@ def main(filename: str, out: str, threshold: int = 80):
     df_grouped["Attendance"] = df_grouped[duration_col_name].apply(
         lambda x: "H" if x >= new_thresh else None
     )
+    return df_grouped
+
+
+def main(filename: str, out: str, threshold: int = 80):
+    with profiling.stage("read") as stage:
+        df: pd.DataFrame = read_df(filename)
+        stage.rows = len(df)
+
+    with profiling.stage("transform") as stage:
+        df_grouped = summarize_attendance(df, threshold)
+        stage.rows = len(df_grouped)
 
-    write_df(df_grouped, out, index=False)
+    with profiling.stage("write", rows=len(df_grouped)):
+        write_df(df_grouped, out, index=False)
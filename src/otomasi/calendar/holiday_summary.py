@@ -1,11 +1,15 @@
 from argparse import FileType
+import glob
 import json
+import os
+import numpy as np
 import pandas as pd
 
 from enum import Enum
 from datetime import datetime, timedelta
 
-from otomasi.utilities.files import DfOutFormat, write_df
+from otomasi.utilities import profiling
+from otomasi.utilities.files import DfOutFormat, expand_globs, write_df, write_sheets
 
 
 class Days(Enum):
@@ -19,41 +23,97 @@ class Days(Enum):
 
 
 def generate_schedule(
-    start_date: datetime, week_count: int, class_schedule: dict[str, int]
+    start_date: datetime, week_count: int, class_schedule: dict[str, str]
 ) -> pd.DataFrame:
-    seed = {
-        "minggu": [i for i in range(1, week_count + 1)],
-        "week_start": [
-            (start_date + timedelta(days=(7 * i))) for i in range(week_count)
-        ],
+    week_start = pd.date_range(start_date, periods=week_count, freq="7D")
+    # Create each class date schedule, all columns at once instead of one
+    # insertion per class
+    class_dates = {
+        class_name: week_start + timedelta(days=Days[class_day].value)
+        for class_name, class_day in class_schedule.items()
     }
-    schedule = pd.DataFrame(seed)
-    # Create each class date schedule
-    for class_name, class_day in class_schedule.items():
-        day_diff = timedelta(days=Days[class_day].value)
-        schedule[class_name] = schedule.apply(lambda x: x.week_start + day_diff, axis=1)
+    return pd.DataFrame({"minggu": np.arange(1, week_count + 1), **class_dates})
 
-    schedule.drop("week_start", axis=1, inplace=True)
-    return schedule
+
+def schedule_from_seed(seed: dict) -> pd.DataFrame:
+    """Schedule of a seed in the format of config/calendar/schedule_template.json"""
+    return generate_schedule(
+        datetime.fromisoformat(seed["start_date"]),
+        int(seed["week_count"]),
+        seed["class_schedule"],
+    )
+
+
+def generate_schedules(seeds: dict[str, dict]) -> dict[str, pd.DataFrame]:
+    """Schedules of several seeds, keyed like seeds (e.g. by course or campus)"""
+    return {name: schedule_from_seed(seed) for name, seed in seeds.items()}
 
 
 def format_list_in_csv(list):
     return f"{",".join(list)}"
 
 
-def filter_holidays(
-    schedule: pd.DataFrame, holidays: pd.DataFrame, class_cols: list[str]
-) -> pd.DataFrame:
-    for col in class_cols:
-        schedule[f"{col}_holiday"] = schedule[col].apply(
-            lambda x: format_list_in_csv(
-                holidays.loc[
-                    (holidays["start"] <= x) & (holidays["end"] >= x), "detail"
-                ].values
+class HolidayIndex:
+    """
+    Holiday date ranges prepared for vectorized lookups
+
+    Built once from a holiday list with start, end and detail columns, it can
+    be shared by every schedule filtered against the same holidays.
+    """
+
+    def __init__(self, holidays: pd.DataFrame):
+        # a holiday missing one of its dates never matches
+        valid = (holidays["start"].notna() & holidays["end"].notna()).to_numpy()
+        self.starts = holidays["start"].to_numpy(dtype="datetime64[ns]")[valid]
+        self.ends = holidays["end"].to_numpy(dtype="datetime64[ns]")[valid]
+        self.details = holidays["detail"].to_numpy(dtype=object)[valid]
+
+    def lookup(self, dates: np.ndarray) -> np.ndarray:
+        """
+        Details of the holidays containing each date, comma separated in the
+        order of the holiday list, or an empty string
+        """
+        unique_dates, inverse = np.unique(dates, return_inverse=True)
+        # each holiday covers a contiguous range of the sorted dates,
+        # overlapping holidays simply have overlapping ranges
+        first = np.searchsorted(unique_dates, self.starts, side="left")
+        last = np.searchsorted(unique_dates, self.ends, side="right")
+        counts = np.clip(last - first, 0, None)
+
+        # one (date, holiday) pair per match
+        holiday_ids = np.repeat(np.arange(len(counts)), counts)
+        range_starts = np.repeat(np.cumsum(counts) - counts, counts)
+        offsets = np.arange(counts.sum()) - range_starts
+        date_ids = np.repeat(first, counts) + offsets
+
+        labels = np.full(len(unique_dates), "", dtype=object)
+        if len(date_ids):
+            order = np.lexsort((holiday_ids, date_ids))
+            matched = (
+                pd.Series(self.details[holiday_ids[order]])
+                .groupby(date_ids[order])
+                .agg(format_list_in_csv)
             )
-        )
+            labels[matched.index.to_numpy()] = matched.to_numpy()
+        return labels[inverse]
 
-    return schedule
+
+def filter_holidays(
+    schedule: pd.DataFrame,
+    holidays: pd.DataFrame | HolidayIndex,
+    class_cols: list[str],
+) -> pd.DataFrame:
+    if not isinstance(holidays, HolidayIndex):
+        holidays = HolidayIndex(holidays)
+    # every class date is resolved in a single lookup
+    dates = schedule[class_cols].to_numpy(dtype="datetime64[ns]")
+    labels = holidays.lookup(dates.ravel()).reshape(dates.shape)
+    holiday_cols = pd.DataFrame(
+        labels,
+        index=schedule.index,
+        columns=[f"{col}_holiday" for col in class_cols],
+    )
+    return pd.concat([schedule, holiday_cols], axis=1)
 
 
 def format_result(schedule: pd.DataFrame, include_date: bool, class_cols: list[str]):
@@ -64,36 +124,82 @@ def format_result(schedule: pd.DataFrame, include_date: bool, class_cols: list[s
     return schedule
 
 
-def main(
-    seed_file: FileType,
-    holiday_file: FileType,
-    output_path: str,
-    output_format: DfOutFormat,
-    drop_dates: bool,
-):
-    seed = json.load(seed_file)
-    class_names: list[str] = list(seed["class_schedule"].keys())
+def expand_seed_paths(seeds: list[str]) -> list[str]:
+    """Seed files of paths, glob patterns and directories (their JSON files)"""
+    paths: list[str] = []
+    for seed in seeds:
+        if os.path.isdir(seed):
+            paths.extend(sorted(glob.glob(os.path.join(seed, "*.json"))))
+        else:
+            paths.extend(expand_globs([seed]))
+    return paths
+
+
+def seed_name(seed_path: str) -> str:
+    return os.path.splitext(os.path.basename(seed_path))[0]
 
-    # Generate schedule based on descriptor
-    schedule = generate_schedule(
-        datetime.fromisoformat(seed["start_date"]),
-        int(seed["week_count"]),
-        seed["class_schedule"],
-    )
 
-    # Load the holidays list
+def read_holidays(holiday_file: FileType) -> pd.DataFrame:
     holiday_list = pd.read_csv(holiday_file)
     holiday_list["start"] = pd.to_datetime(holiday_list["start"])
     holiday_list["end"] = pd.to_datetime(holiday_list["end"])
+    return holiday_list
 
-    # Join the schedule with the holidays list
-    filtered_schedule = filter_holidays(schedule, holiday_list, class_names)
 
-    # Additional formatting to clean the results
-    filtered_schedule = format_result(filtered_schedule, not drop_dates, class_names)
-
-    # Pretty-print output file name
-    if "." not in output_path:
-        output_path = f"{output_path}.{output_format.value}"
-
-    write_df(filtered_schedule, output_path, output_format, index=False)
+def main(
+    seed_files: list[str],
+    holiday_file: FileType,
+    output_path: str,
+    output_format: DfOutFormat,
+    drop_dates: bool,
+    out_dir: str | None = None,
+    combined: bool = False,
+):
+    paths = expand_seed_paths(seed_files)
+    if not paths:
+        raise ValueError("no seed files found")
+    names = [seed_name(path) for path in paths]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"seed files share names: {sorted(duplicates)}")
+
+    # Load the holidays list, once for every seed
+    with profiling.stage("read") as stage:
+        seeds = {}
+        for name, path in zip(names, paths):
+            with open(path) as seed_file:
+                seeds[name] = json.load(seed_file)
+        holidays = HolidayIndex(read_holidays(holiday_file))
+        stage.rows = len(holidays.details)
+
+    with profiling.stage("transform") as stage:
+        # Generate schedules based on descriptors
+        schedules = generate_schedules(seeds)
+        for name, schedule in schedules.items():
+            class_names: list[str] = list(seeds[name]["class_schedule"].keys())
+            # Join the schedule with the holidays list
+            filtered_schedule = filter_holidays(schedule, holidays, class_names)
+            # Additional formatting to clean the results
+            schedules[name] = format_result(
+                filtered_schedule, not drop_dates, class_names
+            )
+        stage.rows = sum(map(len, schedules.values()))
+
+    with profiling.stage("write", rows=stage.rows):
+        if combined:
+            # one sheet per seed
+            if "." not in output_path:
+                output_path = f"{output_path}.{DfOutFormat.Excel.value}"
+            write_sheets(schedules, output_path, index=False)
+        elif len(schedules) == 1 and out_dir is None:
+            # Pretty-print output file name
+            if "." not in output_path:
+                output_path = f"{output_path}.{output_format.value}"
+            write_df(schedules[names[0]], output_path, output_format, index=False)
+        else:
+            # one file per seed, named after it
+            out_dir = out_dir or "."
+            os.makedirs(out_dir, exist_ok=True)
+            for name, schedule in schedules.items():
+                path = os.path.join(out_dir, f"{name}.{output_format.value}")
+                write_df(schedule, path, output_format, index=False)
@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
 from argparse import ArgumentParser, FileType, Namespace
 
-from otomasi.attendance import zoom_attendance
-from otomasi.calendar import holiday_summary
-from otomasi.grading import adjust_final, compile, dpk
-from otomasi.mentoring import assign_groups, journal_screener, journeys_compile
-from otomasi.utilities.files import DfOutFormat
+# Only lightweight modules are imported here, each subcommand imports its
+# implementation (and with it pandas, numpy, python-docx, ...) inside main()
+from otomasi.grading.join import JoinMethod
+from otomasi.mentoring.grouping import GroupLayout, GroupStrategy
+from otomasi.mentoring.tokenizer import Tokenizer
+from otomasi.utilities import cache, profiling
+from otomasi.utilities.anchor import AnchorMatch
+from otomasi.utilities.formats import DfOutFormat
 
 
 class Subcommand(ABC):
@@ -22,6 +25,34 @@ class Subcommand(ABC):
         raise NotImplementedError
 
 
+def add_jobs_argument(parser: ArgumentParser, help: str, default: int = 1):
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=default,
+        help=f"{help} (default {default})",
+    )
+
+
+def add_stream_argument(parser: ArgumentParser):
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream XLSX inputs row by row and keep only the rows from the anchor onward",
+    )
+
+
+def add_anchor_match_argument(parser: ArgumentParser):
+    parser.add_argument(
+        "--anchor-match",
+        type=AnchorMatch,
+        choices=list(AnchorMatch),
+        default=AnchorMatch.FIRST,
+        help="which cell to use when the anchor appears more than once, error lists every match (--stream always uses the first)",
+    )
+
+
 class Compile(Subcommand):
     def load_parser(self, parser):
         parser.add_argument("master", type=str, help="master reference file to compile")
@@ -42,9 +73,9 @@ class Compile(Subcommand):
         )
         parser.add_argument(
             "--method",
-            type=compile.JoinMethod,
-            choices=list(compile.JoinMethod),
-            default=compile.JoinMethod.LEFT,
+            type=JoinMethod,
+            choices=list(JoinMethod),
+            default=JoinMethod.LEFT,
             help="join method",
         )
         parser.add_argument(
@@ -52,10 +83,22 @@ class Compile(Subcommand):
             action="store_true",
             help="concatenates the inputs first instead of just joining them",
         )
+        add_jobs_argument(
+            parser,
+            "number of worker processes used to read the input files, 0 uses every CPU",
+        )
 
     def main(self, args):
+        from otomasi.grading import compile
+
         compile.main(
-            args.master, args.inputs, args.out, args.column, args.method, args.concat
+            args.master,
+            args.inputs,
+            args.out,
+            args.column,
+            args.method,
+            args.concat,
+            args.jobs,
         )
 
 
@@ -70,9 +113,23 @@ class DPK(Subcommand):
         parser.add_argument(
             "--out", type=str, help="output file name", default="master_dpk"
         )
+        add_jobs_argument(
+            parser,
+            "number of worker processes used to read the DPK files, 0 uses every CPU",
+        )
+        add_stream_argument(parser)
+        add_anchor_match_argument(parser)
 
     def main(self, args):
-        dpk.main(args.inputs, args.out)
+        from otomasi.grading import dpk
+
+        dpk.main(
+            args.inputs,
+            args.out,
+            args.jobs,
+            args.stream,
+            args.anchor_match,
+        )
 
 
 class CompileJourneys(Subcommand):
@@ -90,9 +147,24 @@ class CompileJourneys(Subcommand):
             default="NIM",
         )
         parser.add_argument("--out", type=str, default="journeys")
+        add_jobs_argument(
+            parser,
+            "number of worker processes used to read the grading sheets, 0 uses every CPU",
+        )
+        add_stream_argument(parser)
+        add_anchor_match_argument(parser)
 
     def main(self, args):
-        return journeys_compile.main(args.input_file, args.anchor, args.out)
+        from otomasi.mentoring import journeys_compile
+
+        return journeys_compile.main(
+            args.input_file,
+            args.anchor,
+            args.out,
+            args.jobs,
+            args.stream,
+            args.anchor_match,
+        )
 
 
 class MentorGroup(Subcommand):
@@ -110,9 +182,39 @@ class MentorGroup(Subcommand):
             "--min_size", type=int, default=7, help="Minimum group members count"
         )
         parser.add_argument("--out", type=str, default="mentoring")
+        parser.add_argument(
+            "--strategy",
+            type=GroupStrategy,
+            choices=list(GroupStrategy),
+            default=GroupStrategy.GREEDY,
+            help="how faculty remainders are combined: greedy, or optimal to search for the fewest undersized groups, then the least faculty mixing (default greedy)",
+        )
+        parser.add_argument(
+            "--out-format",
+            type=DfOutFormat,
+            default=DfOutFormat.Excel,
+            choices=[DfOutFormat.Excel, DfOutFormat.CSV, DfOutFormat.Parquet],
+            help="output format of the file, parquet requires pyarrow (default xlsx)",
+        )
+        parser.add_argument(
+            "--layout",
+            type=GroupLayout,
+            choices=list(GroupLayout),
+            help="sheets writes a sheet per group, long a single table with a GROUP column (default sheets for xlsx, long otherwise)",
+        )
 
     def main(self, args):
-        assign_groups.main(args.input_file, args.out, args.group_size, args.min_size)
+        from otomasi.mentoring import assign_groups
+
+        assign_groups.main(
+            args.input_file,
+            args.out,
+            args.group_size,
+            args.min_size,
+            args.strategy,
+            args.out_format,
+            args.layout,
+        )
 
 
 class JournalScreener(Subcommand):
@@ -121,18 +223,76 @@ class JournalScreener(Subcommand):
         parser.add_argument(
             "-o", "--out", type=str, help="output file name", default="result.xlsx"
         )
+        add_jobs_argument(
+            parser,
+            "number of worker processes used to parse and analyse the submissions, 0 picks one per CPU",
+            default=0,
+        )
+        parser.add_argument(
+            "--no-manifest",
+            action="store_true",
+            help="re-screen every file instead of skipping the files unchanged since the last run",
+        )
+        parser.add_argument(
+            "--similarity",
+            type=float,
+            default=0.8,
+            help="minimum Jaccard similarity (0-1) of near-duplicate submissions (default 0.8)",
+        )
+        parser.add_argument(
+            "--fuzzy-paragraphs",
+            action="store_true",
+            help="also report repeated paragraphs differing in case, spacing, punctuation or a few words",
+        )
+        parser.add_argument(
+            "--paragraph-similarity",
+            type=float,
+            default=0.8,
+            help="minimum character n-gram similarity (0-1) of --fuzzy-paragraphs (default 0.8)",
+        )
+        parser.add_argument(
+            "--headers",
+            type=FileType("r"),
+            help="JSON list of template headers excluded from the word count, see config/journal/headers_template.json",
+        )
+        parser.add_argument(
+            "--tokenizer",
+            type=Tokenizer,
+            choices=list(Tokenizer),
+            default=Tokenizer.WHITESPACE,
+            help="how words are split for the word count, nltk needs its punkt_tab data installed locally (default whitespace)",
+        )
+        parser.add_argument(
+            "--stream-output",
+            action="store_true",
+            help="write the result rows and manifest entries while screening to keep memory flat, only a small summary of each submission is kept for the cross-file checks, repetitive pattern rows follow the processing order",
+        )
 
     def main(self, args):
-        journal_screener.main(args.input_dir, args.out)
+        from otomasi.mentoring import journal_screener
+
+        journal_screener.main(
+            args.input_dir,
+            args.out,
+            args.jobs,
+            not args.no_manifest,
+            args.similarity,
+            args.fuzzy_paragraphs,
+            args.paragraph_similarity,
+            args.headers,
+            args.tokenizer,
+            args.stream_output,
+        )
 
 
 class HolidaySummary(Subcommand):
     def load_parser(self, parser):
         parser.add_argument(
-            "seed_file",
-            type=FileType("r"),
+            "seed_files",
+            type=str,
+            nargs="+",
             metavar="seed-file",
-            help="JSON file containing information about the class schedule",
+            help="JSON files containing information about the class schedule, glob patterns or directories of them",
         )
         parser.add_argument(
             "holiday_file",
@@ -160,14 +320,28 @@ class HolidaySummary(Subcommand):
             action="store_true",
             help="drop the date columns for classes",
         )
+        parser.add_argument(
+            "--out-dir",
+            type=str,
+            help="write one file per seed to this directory, named after the seed, always the case with several seeds (default current directory)",
+        )
+        parser.add_argument(
+            "--combined",
+            action="store_true",
+            help="write every seed to its own sheet of a single xlsx workbook at --output instead",
+        )
 
     def main(self, args):
+        from otomasi.calendar import holiday_summary
+
         holiday_summary.main(
-            args.seed_file,
+            args.seed_files,
             args.holiday_file,
             args.output,
             args.out_format,
             args.drop_dates,
+            args.out_dir,
+            args.combined,
         )
 
 
@@ -185,15 +359,18 @@ class ZoomAttendance(Subcommand):
         )
 
     def main(self, args):
+        from otomasi.attendance import zoom_attendance
+
         zoom_attendance.main(args.filename, args.out, args.threshold)
 
 
 class AdjustScore(Subcommand):
     def load_parser(self, parser):
         parser.add_argument(
-            "input_file",
+            "inputs",
             type=str,
-            help="Final score file",
+            nargs="+",
+            help="final score files or glob patterns",
         )
         parser.add_argument(
             "grade_config",
@@ -221,12 +398,35 @@ class AdjustScore(Subcommand):
             type=str,
             nargs="?",
             default="adjusted.xlsx",
-            help="output file location",
+            help="output file location, used when a single file is adjusted",
+        )
+        parser.add_argument(
+            "--out-dir",
+            type=str,
+            help="write the adjusted files to this directory as <input name>_adjusted, always the case with several inputs (default current directory)",
+        )
+        parser.add_argument(
+            "--all-sheets",
+            action="store_true",
+            help="adjust every sheet of the xlsx inputs having the score and index columns, instead of the first one",
+        )
+        add_jobs_argument(
+            parser,
+            "number of worker processes used to read the score files, 0 uses every CPU",
         )
 
     def main(self, args):
+        from otomasi.grading import adjust_final
+
         adjust_final.main(
-            args.input_file, args.grade_config, args.score, args.index, args.output
+            args.inputs,
+            args.grade_config,
+            args.score,
+            args.index,
+            args.output,
+            args.out_dir,
+            args.jobs,
+            args.all_sheets,
         )
 
 
@@ -260,6 +460,28 @@ def get_subcommands() -> list[Subcommand]:
 
 def main():
     parser = ArgumentParser(prog="otomasi")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse input files instead of using the parsed file cache",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the wall time, CPU time, peak memory and row count of each read/transform/write stage",
+    )
+    parser.add_argument(
+        "--profile-json",
+        type=str,
+        metavar="FILE",
+        help="also save the --profile stages as JSON (implies --profile)",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=str,
+        metavar="FILE",
+        help="save cProfile statistics of the run, e.g. for python -m pstats or snakeviz",
+    )
     subparsers = parser.add_subparsers(
         dest="command", help="The command to run which module", required=True
     )
@@ -271,5 +493,24 @@ def main():
         # Set the function to run the subcommand
         subcommand_parser.set_defaults(func=subcommand.main)
     args = parser.parse_args()
+    cache.configure(enabled=not args.no_cache)
+    if args.profile or args.profile_json:
+        profiling.enable()
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
     # Run the function set with set_defaults(), passing the arguments as parameters
-    args.func(args)
+    try:
+        args.func(args)
+    finally:
+        if args.cprofile:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"cProfile statistics saved to {args.cprofile}")
+        profile = profiling.disable()
+        if profile is not None:
+            print(profile.summary())
+            if args.profile_json:
+                profile.dump(args.profile_json)
@@ -1,8 +1,21 @@
 import json
+import os
 from argparse import FileType
+import numpy as np
 import pandas as pd
+from tabulate import tabulate
 
-from otomasi.utilities.files import read_df, write_df
+from otomasi.utilities import profiling
+from otomasi.utilities.files import (
+    expand_globs,
+    read_df,
+    read_dfs,
+    write_df,
+    write_sheets,
+)
+from otomasi.utilities.formats import DfInFormat, get_extension
+
+INDEX_SET = {"A", "AB", "B", "BC", "C", "D", "E"}
 
 
 def enforce_grade(
@@ -20,22 +33,161 @@ def enforce_grade(
             return enforced
 
 
+def enforce_grades(
+    df: pd.DataFrame, upper_thresh: dict[str, int], score_col: str, index_col: str
+) -> pd.Series:
+    """
+    enforce_grade applied to every row of df at once
+
+    The index column is mapped to its upper threshold, scores below it are
+    kept and the others are set to the threshold - 2. Rows missing either
+    value become NA, and an index without a threshold raises a KeyError, as
+    in enforce_grade. The result has the dtype the row-wise version infers.
+    """
+    # the scores as enforce_grade sees them, nullable integers stay integers
+    scores = df[score_col].to_numpy(dtype=object)
+    indexes = df[index_col]
+    valid = ~(pd.isna(scores) | indexes.isna().to_numpy())
+
+    # position of every index in the config, -1 for unknown or missing ones
+    codes = pd.Categorical(indexes, categories=list(upper_thresh)).codes
+    unknown = valid & (codes == -1)
+    if unknown.any():
+        raise KeyError(indexes[unknown].iloc[0])
+    thresholds = np.array(list(upper_thresh.values()))[codes]
+
+    # chosen between object arrays so kept scores and lowered thresholds keep
+    # their own types, like the scalars returned by enforce_grade
+    adjusted = np.full(len(df), pd.NA, dtype=object)
+    rows = np.flatnonzero(valid)
+    below = scores[rows] < thresholds[rows]
+    adjusted[rows] = np.where(
+        below, scores[rows], (thresholds[rows] - 2).astype(object)
+    )
+    return pd.Series(adjusted, index=df.index).infer_objects()
+
+
+def load_grade_config(grade_config: FileType) -> dict[str, int]:
+    upper_thresh: dict[str, int] = json.load(grade_config)
+    if INDEX_SET != upper_thresh.keys():
+        raise ValueError(f"Index must only contain {INDEX_SET}")
+    return upper_thresh
+
+
+def read_sheets(score_file: str, all_sheets: bool = False) -> dict:
+    """
+    Read the tables of score_file keyed by sheet name, the only table of a
+    file read without all_sheets is keyed by None
+    """
+    if all_sheets and get_extension(score_file) == DfInFormat.Excel.value:
+        return read_df(score_file, sheet_name=None)
+    return {None: read_df(score_file)}
+
+
+def count_adjusted(scores: pd.Series, adjusted: pd.Series) -> int:
+    """Number of scores changed by the adjustment, missing ones excluded"""
+    present = adjusted.notna().to_numpy()
+    original = scores.to_numpy(dtype=object)[present]
+    return int((adjusted.to_numpy(dtype=object)[present] != original).sum())
+
+
+def adjusted_path(score_file: str, out_dir: str) -> str:
+    stem, _, extension = os.path.basename(score_file).rpartition(".")
+    return os.path.join(out_dir, f"{stem or extension}_adjusted.{extension}")
+
+
 def main(
-    score_file: str,
+    score_files: list[str],
     grade_config: FileType,
     score_col: str,
     index_col: str,
-    output_path: str,
+    output_path: str = "adjusted.xlsx",
+    out_dir: str | None = None,
+    jobs: int = 1,
+    all_sheets: bool = False,
 ):
-    grade_df = read_df(score_file)
-    upper_thresh: dict[str, int] = json.load(grade_config)
+    # extract globs and flatten into path list
+    paths = expand_globs(score_files)
+    if not paths:
+        raise ValueError("no score files found")
+    # a single file is written to output_path, several into out_dir
+    if len(paths) == 1 and out_dir is None:
+        outputs = [output_path]
+    else:
+        out_dir = out_dir or "."
+        outputs = [adjusted_path(path, out_dir) for path in paths]
+        duplicates = {out for out in outputs if outputs.count(out) > 1}
+        if duplicates:
+            raise ValueError(f"input files share output names: {sorted(duplicates)}")
+        os.makedirs(out_dir, exist_ok=True)
 
-    INDEX_SET = {"A", "AB", "B", "BC", "C", "D", "E"}
-    if INDEX_SET != upper_thresh.keys():
-        raise ValueError(f"Index must only contain {INDEX_SET}")
+    # parsed once for every file and sheet
+    upper_thresh = load_grade_config(grade_config)
+
+    # read files, files that can't be read are reported and skipped
+    with profiling.stage("read") as stage:
+        read_results = read_dfs(paths, jobs, reader=read_sheets, all_sheets=all_sheets)
+        stage.rows = sum(
+            len(df) for r in read_results if r.error is None for df in r.df.values()
+        )
+    if all(r.error is not None for r in read_results):
+        raise ValueError("none of the input files could be read")
 
-    grade_df["SCORE_ADJUSTED"] = grade_df.apply(
-        lambda x: enforce_grade(x, upper_thresh, score_col, index_col), axis=1
+    # files that can't be read or adjusted are listed in the report, with
+    # their error, and aren't written
+    errors = {r.path: r.error for r in read_results if r.error is not None}
+    report = []
+    with profiling.stage("transform") as stage:
+        for result in read_results:
+            if result.error is not None:
+                continue
+            file_report = []
+            try:
+                for sheet, grade_df in result.df.items():
+                    if all_sheets and not {score_col, index_col} <= set(
+                        grade_df.columns
+                    ):
+                        # other sheets of the workbook are written back unchanged
+                        print(
+                            f"warning: sheet {sheet} of {result.path} has no {score_col} and {index_col} columns, skipping"
+                        )
+                        continue
+                    grade_df["SCORE_ADJUSTED"] = enforce_grades(
+                        grade_df, upper_thresh, score_col, index_col
+                    )
+                    file_report.append(
+                        {
+                            "file": result.path,
+                            "sheet": sheet if sheet is not None else "",
+                            "rows": len(grade_df),
+                            "adjusted": count_adjusted(
+                                grade_df[score_col], grade_df["SCORE_ADJUSTED"]
+                            ),
+                            "missing": int(grade_df["SCORE_ADJUSTED"].isna().sum()),
+                        }
+                    )
+            except KeyError as e:
+                # a missing column or an index without a threshold
+                errors[result.path] = f"{type(e).__name__}: {e}"
+                print(f"error: unable to adjust {result.path}: {errors[result.path]}")
+                continue
+            report.extend(file_report)
+        stage.rows = sum(row["rows"] for row in report)
+    if len(errors) == len(read_results):
+        raise ValueError("none of the input files could be adjusted")
+    report.extend(
+        {"file": r.path, "error": errors[r.path]}
+        for r in read_results
+        if r.path in errors
     )
 
-    write_df(grade_df, output_path, index=False)
+    with profiling.stage("write", rows=stage.rows):
+        for result, output in zip(read_results, outputs):
+            if result.path in errors:
+                continue
+            if list(result.df) == [None]:
+                write_df(result.df[None], output, index=False)
+            else:
+                write_sheets(result.df, output, index=False)
+
+    print(tabulate(report, headers="keys"))
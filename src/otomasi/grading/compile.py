@@ -1,17 +1,8 @@
-from enum import Enum
 import pandas as pd
 
-from otomasi.utilities.files import read_df, write_df
-
-
-class JoinMethod(Enum):
-    LEFT = "left"
-    RIGHT = "right"
-    OUTER = "outer"
-    INNER = "inner"
-
-    def __str__(self):
-        return self.value
+from otomasi.grading.join import JoinMethod
+from otomasi.utilities import profiling
+from otomasi.utilities.files import expand_globs, read_df, read_dfs, write_df
 
 
 def combine_dataframes(
@@ -37,12 +28,18 @@ def main(
     join_key: str,
     how: JoinMethod = JoinMethod.LEFT,
     concat: bool = False,
+    jobs: int = 1,
 ):
     cast_dtype = {join_key: "string"}
-    master_df = read_df(master, dtype=cast_dtype)
-    inputs_df = [read_df(input, dtype=cast_dtype) for input in inputs]
+    with profiling.stage("read") as stage:
+        master_df = read_df(master, dtype=cast_dtype)
+        read_results = read_dfs(expand_globs(inputs), jobs, dtype=cast_dtype)
+        inputs_df = [result.df for result in read_results if result.df is not None]
+        stage.rows = len(master_df) + sum(map(len, inputs_df))
 
-    compiled_df = combine_dataframes(master_df, inputs_df, join_key, how, concat)
+    with profiling.stage("transform") as stage:
+        compiled_df = combine_dataframes(master_df, inputs_df, join_key, how, concat)
+        stage.rows = len(compiled_df)
 
     index_counts = compiled_df.index.value_counts()
     duplicate_counts = index_counts[index_counts > 1]
@@ -50,4 +47,5 @@ def main(
         print("warning: duplicates found. ignore this if this is expected")
         print(duplicate_counts.to_string())
 
-    write_df(compiled_df, out)
+    with profiling.stage("write", rows=len(compiled_df)):
+        write_df(compiled_df, out)
@@ -1,36 +1,83 @@
-import glob
-import itertools
 import re
 import pandas as pd
 
-from otomasi.utilities.files import read_df, write_df
-from otomasi.utilities.xlsx import extract_table, find_anchor
+from otomasi.utilities import profiling
+from otomasi.utilities.files import expand_globs, read_df, read_dfs, write_df
+from otomasi.utilities.formats import get_extension
+from otomasi.utilities.xlsx import (
+    AnchorMatch,
+    extract_table,
+    find_anchor,
+    read_anchored_xlsx,
+)
 
 KELAS_RE = re.compile(r"No Kelas: (\d{2})")
+# Sheet row (0-based) containing the class number
+KELAS_ROW = 4
 
 
-def extract_data(df: pd.DataFrame, anchor: str):
-    (row, col) = find_anchor(df, anchor)
-    df_extracted = extract_table(df, start_row=row, start_col=col)
-    match = KELAS_RE.search(str(df.iloc[3, 0]))
+def _label_kelas(df_extracted: pd.DataFrame, kelas_cell) -> pd.DataFrame | None:
+    match = KELAS_RE.search(str(kelas_cell))
     if match:
         kelas = match.group(1)
         df_extracted["KELAS"] = f"K{kelas}"
         return df_extracted
 
 
+def extract_data(
+    df: pd.DataFrame, anchor: str, on_multiple: AnchorMatch = AnchorMatch.FIRST
+):
+    (row, col) = find_anchor(df, anchor, on_multiple=on_multiple)
+    df_extracted = extract_table(df, start_row=row, start_col=col)
+    # the first sheet row is consumed as the Dataframe header
+    return _label_kelas(df_extracted, df.iloc[KELAS_ROW - 1, 0])
+
+
+def read_data_streaming(path: str, anchor: str):
+    if get_extension(path) != "xlsx":
+        return extract_data(read_df(path), anchor)
+    table, preamble = read_anchored_xlsx(path, anchor)
+    kelas_cell = preamble[KELAS_ROW][0] if len(preamble) > KELAS_ROW else None
+    return _label_kelas(extract_table(table), kelas_cell)
+
+
 def main(
     globs: list[str],
     out: str,
+    jobs: int = 1,
+    stream: bool = False,
+    on_multiple: AnchorMatch = AnchorMatch.FIRST,
 ):
     # extract globs and flatten into path list
-    paths_lists = [glob.glob(_glob, recursive=True) for _glob in globs]
-    paths = list(itertools.chain(*paths_lists))
+    paths = expand_globs(globs)
 
-    # read dataframes
-    df_inputs = [read_df(path) for path in paths]
+    # read dataframes, files that can't be read are reported and skipped
+    if stream:
+        # extract the tables while the sheets are streamed in
+        with profiling.stage("read") as stage:
+            read_results = read_dfs(
+                paths, jobs, reader=read_data_streaming, anchor="NO"
+            )
+            df_processed = [r.df for r in read_results if r.error is None]
+            # tables without a class number are None and skipped by concat
+            stage.rows = sum(len(df) for df in df_processed if df is not None)
+    else:
+        with profiling.stage("read") as stage:
+            read_results = read_dfs(paths, jobs)
+            stage.rows = sum(len(r.df) for r in read_results if r.error is None)
+        with profiling.stage("extract") as stage:
+            df_processed = [
+                extract_data(r.df, "NO", on_multiple)
+                for r in read_results
+                if r.error is None
+            ]
+            stage.rows = sum(len(df) for df in df_processed if df is not None)
+    if not df_processed:
+        raise ValueError("none of the input files could be read")
 
-    df_processed = [extract_data(df, "NO") for df in df_inputs]
-    df_concat = pd.concat(df_processed)
+    with profiling.stage("transform") as stage:
+        df_concat = pd.concat(df_processed)
+        stage.rows = len(df_concat)
 
-    write_df(df_concat, out, index=False)
+    with profiling.stage("write", rows=len(df_concat)):
+        write_df(df_concat, out, index=False)
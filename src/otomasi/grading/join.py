@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class JoinMethod(Enum):
+    LEFT = "left"
+    RIGHT = "right"
+    OUTER = "outer"
+    INNER = "inner"
+
+    def __str__(self):
+        return self.value
@@ -1,28 +1,46 @@
+import numpy as np
 import pandas as pd
+import time
 import unicodedata
-from otomasi.utilities.files import read_df
+from otomasi.mentoring.grouping import GroupLayout, GroupStrategy
+from otomasi.utilities import profiling
+from otomasi.utilities.files import read_df, write_df, write_sheets
+from otomasi.utilities.formats import DfOutFormat
 from collections import deque
+from importlib.util import find_spec
+
+# Seconds the optimal strategy searches before keeping its best packing
+PACKING_TIME_LIMIT = 1.0
+# Column naming the group of every student in the long layout
+GROUP_COLUMN = "GROUP"
 
 
 class GroupDistributor:
+    """
+    Combines faculty remainders into groups of group_size members
+
+    Groups are arrays of row positions, the rows themselves are only taken
+    once the groups are complete.
+    """
+
     def __init__(self, group_size, min_group_size=-1) -> None:
         self.group_size = group_size
         self.min_group_size = min_group_size
         # List of groups where ith elements are groups with i members
         # i.e. group_queues[0] has 0 member, group_queues[1] has 1 member, ...,
         # group_queues[group_size] has group_size members
-        self.group_queues: list[deque[list[pd.DataFrame]]] = [
+        self.group_queues: list[deque[list[np.ndarray]]] = [
             deque() for _ in range(group_size)
         ]
-        self.complete_groups: list[pd.DataFrame] = []
+        self.complete_groups: list[np.ndarray] = []
 
-    def enqueue_group(self, group: pd.DataFrame):
+    def enqueue_group(self, group: np.ndarray):
         group_len = len(group)
         # check if deque is not empty (there exist a group requiring group_len more members
         if self.group_queues[-group_len]:
             new_group = self.group_queues[-group_len].pop()
             new_group.append(group)
-            self.complete_groups.append(pd.concat(new_group))
+            self.complete_groups.append(np.concatenate(new_group))
         else:  # deque is empty, insert the group as the group requiring group_size - group_len more members
             self.group_queues[group_len].append([group])
 
@@ -34,10 +52,10 @@ class GroupDistributor:
             for group_deque in self.group_queues:
                 while group_deque:
                     group = group_deque.pop()
-                    self.complete_groups.append(pd.concat(group))
+                    self.complete_groups.append(np.concatenate(group))
         else:
             count = 0
-            temp_groups: list[pd.DataFrame] = []
+            temp_groups: list[np.ndarray] = []
             for i, group_deque in reversed(list(enumerate(self.group_queues))):
                 curr_group_size = i
                 while group_deque:
@@ -56,46 +74,176 @@ class GroupDistributor:
                             remaining -= 1
                     # if the group meet the minimum group size, sum up, then restart
                     if count >= self.min_group_size or group_deque:
-                        new_group = pd.concat(temp_groups)
+                        new_group = np.concatenate(temp_groups)
                         self.complete_groups.append(new_group)
                         count = 0
                         temp_groups = []
             # finished iterating all groups, dump the remaining unallocated groups
             if temp_groups:
-                unallocated_group = pd.concat(temp_groups)
+                unallocated_group = np.concatenate(temp_groups)
                 self.enqueue_group(unallocated_group)
             self.dump_remainders()
 
         return self.complete_groups
 
     def dump_remainders(self):
-        temp_groups: list[pd.DataFrame] = []
+        temp_groups: list[np.ndarray] = []
         for group_deque in self.group_queues:
             while group_deque:
                 temp_groups.extend(group_deque.pop())
         if temp_groups:
-            self.complete_groups.append(pd.concat(temp_groups))
+            self.complete_groups.append(np.concatenate(temp_groups))
+
+
+def pack_remainders(
+    sizes: list[int],
+    group_size: int,
+    min_group_size: int,
+    time_limit: float = PACKING_TIME_LIMIT,
+) -> list[list[int]]:
+    """
+    Pack faculty remainders into groups of at most group_size members
+
+    Remainders are never split, and every remainder comes from another
+    faculty. The packing minimizes the number of groups below min_group_size
+    first, then the number of groups mixing several faculties, then
+    maximizes the number of groups, so mixed groups hold few faculties.
+    Solved by branch and bound, the best packing found within time_limit
+    seconds is returned if the search doesn't finish.
+
+    Returns the positions in sizes of the remainders of every group, groups
+    ordered by their first remainder.
+    """
+    if min_group_size <= 0:
+        # no minimum to reach, mixing is avoided by keeping them apart
+        return [[idx] for idx in range(len(sizes))]
+
+    order = sorted(range(len(sizes)), key=lambda idx: -sizes[idx])
+    # total size of the remainders not placed yet, per search depth
+    remaining = [0] * (len(order) + 1)
+    for depth in reversed(range(len(order))):
+        remaining[depth] = remaining[depth + 1] + sizes[order[depth]]
+    # a mixed group costs more than any number of groups, and a group below
+    # min_group_size more than any number of mixed groups
+    mixed_cost = len(sizes) + 1
+    undersized_cost = mixed_cost * (len(sizes) + 1)
+
+    def cost(loads: list[int], groups: list[list[int]]) -> int:
+        undersized = sum(load < min_group_size for load in loads)
+        mixed = sum(len(group) > 1 for group in groups)
+        return undersized * undersized_cost + mixed * mixed_cost - len(loads)
+
+    def lower_bound(loads: list[int], groups: list[list[int]], depth: int) -> int:
+        # the remaining members at best fill the smallest shortfalls, and
+        # open new groups of exactly min_group_size, mixed groups stay mixed
+        budget = remaining[depth]
+        shortfalls = sorted(min_group_size - load for load in loads)
+        undersized = 0
+        for shortfall in shortfalls:
+            if shortfall <= 0:
+                continue
+            if shortfall <= budget:
+                budget -= shortfall
+            else:
+                undersized += 1
+        mixed = sum(len(group) > 1 for group in groups)
+        new_groups = remaining[depth] // min_group_size
+        return (
+            undersized * undersized_cost + mixed * mixed_cost - len(loads) - new_groups
+        )
+
+    # every remainder in its own group is always a valid packing
+    best_groups = [[idx] for idx in range(len(sizes))]
+    best_cost = cost(sizes, best_groups)
+    deadline = time.perf_counter() + time_limit
+    loads: list[int] = []
+    groups: list[list[int]] = []
+
+    def search(depth: int) -> bool:
+        """Try every placement of order[depth:], False once out of time"""
+        nonlocal best_cost, best_groups
+        if time.perf_counter() > deadline:
+            return False
+        if depth == len(order):
+            if cost(loads, groups) < best_cost:
+                best_cost = cost(loads, groups)
+                best_groups = [list(group) for group in groups]
+            return True
+        if lower_bound(loads, groups, depth) >= best_cost:
+            return True
+
+        idx = order[depth]
+        size = sizes[idx]
+        # groups with the same load, mixed or not, lead to the same packings,
+        # try one each, fullest first and mixed ones before they mix another
+        fitting = {}
+        for group_idx, load in enumerate(loads):
+            key = (load, len(groups[group_idx]) > 1)
+            if load + size <= group_size and key not in fitting:
+                fitting[key] = group_idx
+        joins = [fitting[key] for key in sorted(fitting, reverse=True)]
+        # large remainders likely stay alone, small ones likely join a group
+        branches = [None, *joins] if size >= min_group_size else [*joins, None]
+        for group_idx in branches:
+            if group_idx is None:
+                loads.append(size)
+                groups.append([idx])
+            else:
+                loads[group_idx] += size
+                groups[group_idx].append(idx)
+            finished = search(depth + 1)
+            if group_idx is None:
+                loads.pop()
+                groups.pop()
+            else:
+                loads[group_idx] -= size
+                groups[group_idx].pop()
+            if not finished:
+                return False
+        return True
 
+    search(0)
+    return sorted((sorted(group) for group in best_groups), key=lambda group: group[0])
 
-def distribute_groups(dataset: pd.DataFrame, group_size, min_group_size):
+
+def faculty_positions(dataset: pd.DataFrame) -> list[np.ndarray]:
+    """
+    Row positions of every faculty in dataset, faculties in sorted order
+
+    Rows keep their order within a faculty, rows without a faculty are left out
+    like groupby does.
+    """
+    codes, faculties = pd.factorize(dataset["FAKULTAS"], sort=True)
+    positions = np.argsort(codes, kind="stable")
+    # missing faculties have code -1 and sort before the first bound
+    bounds = np.searchsorted(codes[positions], np.arange(len(faculties) + 1))
+    return [positions[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def distribute_groups(
+    dataset: pd.DataFrame,
+    group_size,
+    min_group_size,
+    strategy: GroupStrategy = GroupStrategy.GREEDY,
+):
     if "RUMPUN" in dataset.columns:
         dataset = dataset.sort_values("RUMPUN")
     else:
         dataset = dataset.sort_values("PRODI")
-    grouped = dataset.groupby("FAKULTAS")
-    groups: list[pd.DataFrame] = []
+    # groups are assembled as row positions of dataset
+    groups: list[np.ndarray] = []
 
     group_distributor = GroupDistributor(group_size, min_group_size)
-    for _, group in grouped:
+    remainders: list[np.ndarray] = []
+    for group in faculty_positions(dataset):
         cur_group = group
         group_len = len(group)
         # if group is larger than the target size, split the group
         if group_len > group_size:
-            cur_group = cur_group.reset_index(drop=True)
             n_groups = group_len // group_size
             for i in range(n_groups):
                 start = i * group_size
-                groups.append(cur_group.iloc[start : start + group_size, :])
+                groups.append(cur_group[start : start + group_size])
 
             # process the remainder group
             remainder_size = group_len % group_size
@@ -103,70 +251,147 @@ def distribute_groups(dataset: pd.DataFrame, group_size, min_group_size):
                 last_slice = n_groups * group_size
                 # swap the remainder into group and group_len
                 # to use the same logic as small groups
-                cur_group = cur_group.iloc[last_slice:, :]
+                cur_group = cur_group[last_slice:]
                 group_len = remainder_size
             else:  # no remainder remaining, continue to the next groups
                 continue
-        if group_len >= min_group_size:
+        if strategy == GroupStrategy.OPTIMAL and group_len < group_size:
+            # packed together once every faculty is split
+            remainders.append(cur_group)
+        elif group_len >= min_group_size:
             groups.append(cur_group)
         else:  # group_len < group_size
             group_distributor.enqueue_group(cur_group)
-    remaining_groups = group_distributor.combine_remainders()
-    groups.extend(remaining_groups)
-    return groups
+    if strategy == GroupStrategy.OPTIMAL:
+        packing = pack_remainders(
+            [len(remainder) for remainder in remainders], group_size, min_group_size
+        )
+        groups.extend(
+            np.concatenate([remainders[idx] for idx in packed]) for packed in packing
+        )
+    else:
+        groups.extend(group_distributor.combine_remainders())
+    if not groups:
+        return []
+    # take the rows of every group at once, the groups are slices of it
+    ordered = dataset.take(np.concatenate(groups))
+    bounds = np.cumsum([0] + [len(positions) for positions in groups])
+    return [ordered.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
 
 
-def create_groups(dataset: pd.DataFrame, group_size=8, min_group_size=6):
+def create_groups(
+    dataset: pd.DataFrame,
+    group_size=8,
+    min_group_size=6,
+    strategy: GroupStrategy = GroupStrategy.GREEDY,
+):
     # split male/female students into primary groups
     l_dataset = dataset[dataset["KELOMPOK"].values == "L"]
     p_dataset = dataset[dataset["KELOMPOK"].values == "P"]
 
-    l_datasets = distribute_groups(l_dataset, group_size, min_group_size)
-    p_datasets = distribute_groups(p_dataset, group_size, min_group_size)
+    l_datasets = distribute_groups(l_dataset, group_size, min_group_size, strategy)
+    p_datasets = distribute_groups(p_dataset, group_size, min_group_size, strategy)
     return l_datasets, p_datasets
     # TODO: try custom sorting https://stackoverflow.com/questions/23482668/sorting-by-a-custom-list-in-pandas
     # group into faculties
     # might need to iterate group https://pandas.pydata.org/docs/user_guide/groupby.html#iterating-through-groups
 
 
-def write_to_excel(
-    datasets: list[pd.DataFrame],
-    out: str,
-    category: str,
-    overwrite: bool = False,
-    check_min=0,
-):
-    # https://www.geeksforgeeks.org/how-to-write-pandas-dataframes-to-multiple-excel-sheets/
-    write_mode = "w" if overwrite else "a"
-    with pd.ExcelWriter(f"{out}.xlsx", engine="openpyxl", mode=write_mode) as writer:
+def name_groups(
+    l_groups: list[pd.DataFrame], p_groups: list[pd.DataFrame]
+) -> dict[str, pd.DataFrame]:
+    """Groups by name, L1, L2, ... then P1, P2, ..."""
+    groups: dict[str, pd.DataFrame] = {}
+    for category, datasets in (("L", l_groups), ("P", p_groups)):
         for idx, group in enumerate(datasets, start=1):
-            group_size = len(group)
-            if group_size == 0 or group_size < check_min:
-                print(
-                    f"Warning: group {category}{idx} does not meet minimum group size!"
-                )
-            group.to_excel(writer, sheet_name=f"{category}{idx}", index=False)
+            groups[f"{category}{idx}"] = group
+    return groups
+
+
+def check_group_sizes(groups: dict[str, pd.DataFrame], check_min=0):
+    for name, group in groups.items():
+        group_size = len(group)
+        if group_size == 0 or group_size < check_min:
+            print(f"Warning: group {name} does not meet minimum group size!")
 
 
-def main(input_file: list[str], out: str, group_size: int, min_size: int):
+def long_groups(groups: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Every group in a single table, with the group name in GROUP_COLUMN"""
+    if not groups:
+        return pd.DataFrame(columns=[GROUP_COLUMN])
+    long = pd.concat(groups.values(), ignore_index=True)
+    names = np.repeat(list(groups), [len(group) for group in groups.values()])
+    long.insert(0, GROUP_COLUMN, names)
+    return long
+
+
+def write_groups(
+    groups: dict[str, pd.DataFrame],
+    out: str,
+    out_format: DfOutFormat = DfOutFormat.Excel,
+    layout: GroupLayout = GroupLayout.SHEETS,
+) -> str:
+    """
+    Write every group in one pass, returns the path of the written file
+
+    The sheets layout writes a sheet per group to an xlsx workbook, the long
+    layout a single table of every group in out_format.
+    """
+    output_path = f"{out}.{out_format.value}"
+    if layout == GroupLayout.SHEETS:
+        write_sheets(groups, output_path, index=False)
+    else:
+        write_df(long_groups(groups), output_path, out_format, index=False)
+    return output_path
+
+
+def main(
+    input_file: list[str],
+    out: str,
+    group_size: int,
+    min_size: int,
+    strategy: GroupStrategy = GroupStrategy.GREEDY,
+    out_format: DfOutFormat = DfOutFormat.Excel,
+    layout: GroupLayout | None = None,
+):
     assert (
         group_size >= min_size
     ), "Group size must be greater or equal to the minimum size!"
+    if layout is None:
+        layout = (
+            GroupLayout.SHEETS if out_format == DfOutFormat.Excel else GroupLayout.LONG
+        )
+    elif layout == GroupLayout.SHEETS and out_format != DfOutFormat.Excel:
+        print(f"warning: {out_format} files hold a single table, using the long layout")
+        layout = GroupLayout.LONG
+    # checked before any grouping is done
+    if out_format == DfOutFormat.Parquet and not (
+        find_spec("pyarrow") or find_spec("fastparquet")
+    ):
+        raise ImportError("writing parquet files requires pyarrow or fastparquet")
 
     l_groups: list[pd.DataFrame] = []
     p_groups: list[pd.DataFrame] = []
     for file in input_file:
-        # use read_df to get encoding fallbacks and consistent file handling
-        dataset = read_df(file)
-        # Normalize header names and ensure required columns exist
-        dataset = _standardize_columns(dataset)
-        _validate_required_columns(dataset)
-        l_datasets, p_datasets = create_groups(dataset, group_size, min_size)
+        with profiling.stage("read") as stage:
+            # use read_df to get encoding fallbacks and consistent file handling
+            dataset = read_df(file)
+            stage.rows = len(dataset)
+        with profiling.stage("transform", rows=len(dataset)):
+            # Normalize header names and ensure required columns exist
+            dataset = _standardize_columns(dataset)
+            _validate_required_columns(dataset)
+            l_datasets, p_datasets = create_groups(
+                dataset, group_size, min_size, strategy
+            )
         l_groups.extend(l_datasets)
         p_groups.extend(p_datasets)
 
-    write_to_excel(l_groups, out, "L", overwrite=True, check_min=min_size)
-    write_to_excel(p_groups, out, "P", overwrite=False, check_min=min_size)
+    groups = name_groups(l_groups, p_groups)
+    check_group_sizes(groups, check_min=min_size)
+    with profiling.stage("write") as stage:
+        write_groups(groups, out, out_format, layout)
+        stage.rows = sum(map(len, groups.values()))
 
 
 def _clean_header(name: str) -> str:
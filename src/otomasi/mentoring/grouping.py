@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class GroupStrategy(Enum):
+    GREEDY = "greedy"
+    OPTIMAL = "optimal"
+
+    def __str__(self):
+        return self.value
+
+
+class GroupLayout(Enum):
+    SHEETS = "sheets"
+    LONG = "long"
+
+    def __str__(self):
+        return self.value
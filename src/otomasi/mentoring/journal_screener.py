@@ -1,11 +1,108 @@
 import os
+from argparse import FileType
 from docx import Document
+import functools
 import hashlib
+import json
 import re
 from collections import defaultdict
+from itertools import combinations
 from tqdm import tqdm
 import concurrent.futures
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook
+
+from otomasi.mentoring.similarity import (
+    MinHasher,
+    candidate_pairs,
+    char_shingles,
+    cluster_signatures,
+    find_similar_pairs,
+    jaccard,
+    lsh_bands,
+)
+from otomasi.mentoring.tokenizer import Tokenizer
+from otomasi.utilities import profiling
+
+# Files sent to a worker process at once, per worker, see process_directory
+CHUNKS_PER_WORKER = 4
+# Bump when the per-file results change shape, older manifests are ignored
+MANIFEST_VERSION = 2
+# Paragraphs up to this length are never reported as repetitive
+MIN_PATTERN_LENGTH = 50
+# Words (with inner hyphens/apostrophes) and single punctuation marks
+REGEX_TOKEN_RE = re.compile(r"\w+(?:[-']\w+)*|[^\w\s]")
+# Month abbreviations of submission dates, in Indonesian and English
+MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "mei": 5,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "agu": 8,
+    "ags": 8,
+    "agt": 8,
+    "aug": 8,
+    "sep": 9,
+    "okt": 10,
+    "oct": 10,
+    "nov": 11,
+    "des": 12,
+    "dec": 12,
+}
+SUBMISSION_DATE_RE = re.compile(r"(\d{1,2})\s*([A-Za-z]{3})")
+
+
+def parse_submission_date(date):
+    """Parse a filename date like "11 Des" or "1 Dec" into (month, day), or None"""
+    match = SUBMISSION_DATE_RE.match(date)
+    if not match:
+        return None
+    month = MONTHS.get(match.group(2).lower())
+    if month is None:
+        return None
+    return (month, int(match.group(1)))
+
+
+def submission_sort_key(submission):
+    """Order by date, unparseable dates last, then by filename"""
+    parsed = parse_submission_date(submission.get("date", ""))
+    return (parsed is None, parsed or (0, 0), submission["filename"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(tokenizer: Tokenizer):
+    """
+    Resolve a tokenizer, once per process (worker processes included)
+
+    NLTK is only imported when requested, and only its locally installed data
+    is used, falling back to the regex tokenizer instead of downloading.
+    """
+    match tokenizer:
+        case Tokenizer.WHITESPACE:
+            return str.split
+        case Tokenizer.REGEX:
+            return REGEX_TOKEN_RE.findall
+        case Tokenizer.NLTK:
+            try:
+                import nltk
+                from nltk.tokenize import word_tokenize
+
+                # raises LookupError without touching the network
+                nltk.data.find("tokenizers/punkt_tab")
+                return word_tokenize
+            except LookupError:
+                print("NLTK punkt_tab data is not installed, using the regex tokenizer")
+                return REGEX_TOKEN_RE.findall
+            except ImportError:
+                print("NLTK is not installed, using the regex tokenizer")
+                return REGEX_TOKEN_RE.findall
+        case _:
+            raise ValueError(f"Unknown tokenizer {tokenizer}")
 
 
 class ContentAnalyzer:
@@ -32,63 +129,130 @@ class ContentAnalyzer:
         "Aplikasi",
     ]
 
-    def __init__(self):
-        self.template_headers = set(self.TEMPLATE_HEADERS_EN + self.TEMPLATE_HEADERS_ID)
-        self._check_nltk_installation()
-
-    def _check_nltk_installation(self):
-        """Verify NLTK is properly installed"""
-        try:
-            import nltk
+    def __init__(
+        self,
+        fuzzy_paragraphs=False,
+        paragraph_threshold=0.8,
+        template_headers=None,
+        tokenizer=Tokenizer.WHITESPACE,
+    ):
+        if template_headers is None:
+            template_headers = self.TEMPLATE_HEADERS_EN + self.TEMPLATE_HEADERS_ID
+        self.template_headers = set(template_headers)
+        # one alternation strips every header in a single pass, longest first
+        # so a header containing another one is removed whole
+        self.header_re = None
+        if self.template_headers:
+            self.header_re = re.compile(
+                "|".join(
+                    re.escape(header)
+                    for header in sorted(self.template_headers, key=len, reverse=True)
+                )
+            )
+        self.minhasher = MinHasher()
+        # fuzzy mode also reports paragraphs differing in case, whitespace or
+        # punctuation, or whose character n-grams are paragraph_threshold similar
+        self.fuzzy_paragraphs = fuzzy_paragraphs
+        if fuzzy_paragraphs:
+            # checked before any file is screened
+            lsh_bands(self.minhasher.num_perm, paragraph_threshold)
+        self.paragraph_threshold = paragraph_threshold
+        # word counting tokenizer, resolved lazily by get_tokenizer, its
+        # name is accepted too
+        self.tokenizer = Tokenizer(tokenizer)
 
-            nltk.download("punkt_tab")
+    def settings(self):
+        """Options affecting the analysis results, stored in screening manifests"""
+        return {
+            "template_headers": sorted(self.template_headers),
+            "minhash": self.minhasher.settings(),
+            "fuzzy_paragraphs": self.fuzzy_paragraphs,
+            "paragraph_threshold": self.paragraph_threshold,
+            "tokenizer": self.tokenizer.value,
+        }
 
-            from nltk.tokenize import word_tokenize
+    def tokenize(self, text):
+        return get_tokenizer(self.tokenizer)(text)
 
-            word_tokenize("Test sentence")
-        except (LookupError, ImportError) as e:
-            print("NLTK data not found. Please run setup_nltk.py first.")
-            print("Error:", str(e))
-            raise SystemExit(1)
+    def strip_headers(self, text):
+        """Remove the template headers from text"""
+        if self.header_re is None:
+            return text
+        return self.header_re.sub("", text)
 
     def count_meaningful_words(self, text):
         """Count words excluding template headers and common words"""
         # Remove template headers
-        for header in self.template_headers:
-            text = text.replace(header, "")
+        text = self.strip_headers(text)
 
-        # Simple word count after cleaning
-        words = [w for w in text.split() if len(w) > 1]
-        return len(words)
+        # Simple word count after cleaning, single character tokens excluded
+        words = self.tokenize(text)
+        return len(words) - list(map(len, words)).count(1)
 
     def detect_repetitive_patterns(self, text):
         """Detect copy-pasted content within the document"""
         # Split into paragraphs
         paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
+        candidates = [
+            (idx, paragraph)
+            for idx, paragraph in enumerate(paragraphs)
+            if len(paragraph) > MIN_PATTERN_LENGTH
+        ]
+        if self.fuzzy_paragraphs:
+            candidates = [
+                (idx, self.normalize_paragraph(paragraph))
+                for idx, paragraph in candidates
+            ]
 
-        # Compare paragraphs for similarity
-        suspicious_patterns = []
-        for i in range(len(paragraphs)):
-            for j in range(i + 1, len(paragraphs)):
-                # Basic similarity check - could be improved
-                if len(paragraphs[i]) > 50 and paragraphs[i] == paragraphs[j]:
-                    suspicious_patterns.append(
-                        {
-                            "paragraph1": paragraphs[i][:100] + "...",
-                            "paragraph2": paragraphs[j][:100] + "...",
-                            "similarity": 1.0,
-                        }
-                    )
+        # Group identical (or identically normalized) paragraphs in one pass
+        buckets = defaultdict(list)
+        for idx, paragraph in candidates:
+            buckets[paragraph].append(idx)
+        similar = {}  # (paragraph index, paragraph index) -> similarity
+        for members in buckets.values():
+            for pair in combinations(members, 2):
+                similar[pair] = 1.0
+        if self.fuzzy_paragraphs:
+            similar.update(self._similar_buckets(list(buckets.items())))
 
-        return suspicious_patterns
+        return [
+            {
+                "paragraph1": paragraphs[i][:100] + "...",
+                "paragraph2": paragraphs[j][:100] + "...",
+                "similarity": similarity,
+            }
+            for (i, j), similarity in sorted(similar.items())
+        ]
+
+    @staticmethod
+    def normalize_paragraph(paragraph):
+        return " ".join(re.findall(r"\w+", paragraph.casefold()))
+
+    def _similar_buckets(self, buckets):
+        """Pairs of paragraphs from different buckets with similar character n-grams"""
+        shingles = [char_shingles(paragraph) for paragraph, _ in buckets]
+        signatures = [self.minhasher.signature_from_shingles(s) for s in shingles]
+        similar = {}
+        # LSH only proposes candidates, their exact n-gram similarity is checked
+        for a, b in sorted(candidate_pairs(signatures, self.paragraph_threshold)):
+            similarity = jaccard(shingles[a], shingles[b])
+            if similarity < self.paragraph_threshold:
+                continue
+            for i in buckets[a][1]:
+                for j in buckets[b][1]:
+                    similar[(min(i, j), max(i, j))] = similarity
+        return similar
+
+    def signature(self, text):
+        """MinHash signature of the text without template headers, None if it is too short"""
+        return self.minhasher.signature(self.strip_headers(text))
 
 
 class FileProcessor:
     """Handles file operations and checking"""
 
-    def __init__(self):
-        self.content_analyzer = ContentAnalyzer()
-        self.student_submissions = defaultdict(list)
+    def __init__(self, content_analyzer=None):
+        self.content_analyzer = content_analyzer or ContentAnalyzer()
 
     def extract_file_info(self, filename):
         """Extract date and student info from filename"""
@@ -131,23 +295,17 @@ class FileProcessor:
             print(f"Error processing filename '{filename}': {str(e)}")
             return None
 
-    def check_file_integrity(self, file_path):
-        """Verify file is a valid DOCX"""
+    def read_document(self, file_path):
+        """Parse a DOCX file once, returning its text content or the integrity error"""
         try:
             doc = Document(file_path)
-            # Try to read some content to verify
-            _ = [p.text for p in doc.paragraphs[:5]]
-            return True, None
         except Exception as e:
-            return False, str(e)
-
-    def get_file_content(self, file_path):
-        """Extract text content from DOCX file"""
+            return None, str(e)
         try:
-            doc = Document(file_path)
-            return "\n".join([p.text for p in doc.paragraphs])
-        except Exception as e:
-            return None
+            return "\n".join([p.text for p in doc.paragraphs]), None
+        except Exception:
+            # the file is a valid DOCX, but its content can't be read
+            return None, None
 
     def process_file(self, file_path):
         """Process a single file and return analysis results"""
@@ -157,9 +315,9 @@ class FileProcessor:
         if not file_info:
             return {"filename": filename, "issues": ["Invalid filename format"]}
 
-        # Check file integrity
-        is_valid, error = self.check_file_integrity(file_path)
-        if not is_valid:
+        # Parse the file, integrity errors are raised while parsing
+        content, error = self.read_document(file_path)
+        if error is not None:
             return {
                 "filename": filename,
                 "student_id": file_info["student_id"],
@@ -167,8 +325,6 @@ class FileProcessor:
                 "issues": [f"File integrity error: {error}"],
             }
 
-        # Get content
-        content = self.get_file_content(file_path)
         if not content:
             return {
                 "filename": filename,
@@ -181,11 +337,10 @@ class FileProcessor:
         word_count = self.content_analyzer.count_meaningful_words(content)
         repetitive_patterns = self.content_analyzer.detect_repetitive_patterns(content)
 
-        # Track for duplicate detection
+        # Hash for duplicate detection, tracked by the caller since this may
+        # run in a worker process
         content_hash = hashlib.md5(content.encode()).hexdigest()
-        self.student_submissions[file_info["student_id"]].append(
-            {"date": file_info["date"], "hash": content_hash, "filename": filename}
-        )
+        signature = self.content_analyzer.signature(content)
 
         # Collect issues
         issues = []
@@ -201,27 +356,183 @@ class FileProcessor:
             "date": file_info["date"],
             "word_count": word_count,
             "content_hash": content_hash,
+            "minhash": None if signature is None else signature.tolist(),
             "repetitive_patterns": repetitive_patterns,
             "issues": issues,
         }
 
 
+class ScreeningManifest:
+    """
+    Per-file screening results kept as JSON lines, so unchanged files are skipped
+
+    Only the file metadata of the entries is kept in memory. The results of
+    unchanged files are read back from the previous manifest when reused, and
+    every entry is written to the new manifest as soon as it is known.
+    """
+
+    def __init__(self, path, settings):
+        self.path = path
+        self.settings = settings
+        # absolute file path -> entry without its result, with the offset of
+        # its line in the previous manifest
+        self.entries = {}
+        self._previous = None
+        self._new = None
+
+    @staticmethod
+    def path_for(output_file):
+        """Manifest location next to the output file"""
+        return f"{os.path.splitext(output_file)[0]}.manifest.jsonl"
+
+    @staticmethod
+    def file_digest(file_path):
+        with open(file_path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    def load(self):
+        """Index the previous entries, unless they were made with other settings"""
+        try:
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline() or b"{}")
+                if header != {"version": MANIFEST_VERSION, "settings": self.settings}:
+                    print("Screening manifest is outdated, re-screening every file")
+                    return
+                offset = f.tell()
+                for line in iter(f.readline, b""):
+                    entry = json.loads(line)
+                    del entry["result"]
+                    entry["offset"] = offset
+                    self.entries[entry["path"]] = entry
+                    offset += len(line)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"Ignoring unreadable screening manifest {self.path}: {e}")
+            self.entries = {}
+
+    def is_unchanged(self, file_path):
+        """Whether file_path has an entry and is unchanged since it was written"""
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None:
+            return False
+        stat = os.stat(file_path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            # touched but maybe not modified, compare the content
+            if self.file_digest(file_path) != entry["file_hash"]:
+                return False
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return True
+
+    def start(self):
+        """Start writing the new manifest, entries are added to it one by one"""
+        self._new = open(f"{self.path}.tmp", "w", encoding="utf-8")
+        header = {"version": MANIFEST_VERSION, "settings": self.settings}
+        self._new.write(json.dumps(header) + "\n")
+        if self.entries:
+            self._previous = open(self.path, "rb")
+
+    def _write(self, entry):
+        self._new.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def reuse(self, file_path):
+        """Read the stored result of an unchanged file and keep its entry"""
+        entry = dict(self.entries[os.path.abspath(file_path)])
+        self._previous.seek(entry.pop("offset"))
+        entry["result"] = json.loads(self._previous.readline())["result"]
+        self._write(entry)
+        return entry["result"]
+
+    def add(self, file_path, result):
+        stat = os.stat(file_path)
+        self._write(
+            {
+                "path": os.path.abspath(file_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "file_hash": self.file_digest(file_path),
+                "result": result,
+            }
+        )
+
+    def finish(self):
+        """Replace the previous manifest, dropping files no longer screened"""
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+        self._new.close()
+        self._new = None
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+# FileProcessor of a worker process, see _init_worker
+_worker_processor = None
+
+
+def _init_worker(content_analyzer):
+    global _worker_processor
+    _worker_processor = FileProcessor(content_analyzer)
+
+
+def _process_file_safely(file_processor, file_path):
+    # an unexpected error only skips its file instead of the whole batch
+    try:
+        return file_processor.process_file(file_path)
+    except Exception as e:
+        print(f"Error processing file: {str(e)}")
+        return None
+
+
+def _process_file_in_worker(file_path):
+    return _process_file_safely(_worker_processor, file_path)
+
+
 class JournalValidator:
     """Main class for journal validation"""
 
-    def __init__(self):
-        self.file_processor = FileProcessor()
+    def __init__(
+        self,
+        jobs=0,
+        manifest_path=None,
+        similarity_threshold=0.8,
+        content_analyzer=None,
+    ):
+        self.file_processor = FileProcessor(content_analyzer)
+        # student_id -> submission records, collected from the file results
+        self.student_submissions = defaultdict(list)
+        # worker processes used to parse files, 1 parses in this process
+        # and 0 uses one worker per CPU
+        self.jobs = jobs
+        # minimum estimated Jaccard similarity of near-duplicate submissions,
+        # checked before any file is screened
+        lsh_bands(
+            self.file_processor.content_analyzer.minhasher.num_perm,
+            similarity_threshold,
+        )
+        self.similarity_threshold = similarity_threshold
+        self.near_duplicates = []
+        # clusters of two or more submissions sharing the same signature
+        self.near_duplicate_clusters = []
+        self.manifest = None
+        if manifest_path is not None:
+            self.manifest = ScreeningManifest(
+                manifest_path, self.file_processor.content_analyzer.settings()
+            )
+            self.manifest.load()
 
     def find_duplicate_submissions(self):
         """Find duplicate submissions across different dates for each student"""
         duplicates = {}  # Use dict to store first duplicate instance per student
 
-        for student_id, submissions in self.file_processor.student_submissions.items():
+        for student_id in sorted(self.student_submissions):
+            submissions = self.student_submissions[student_id]
             if len(submissions) < 2:
                 continue
 
             # Sort submissions by date
-            sorted_submissions = sorted(submissions, key=lambda x: x["date"])
+            sorted_submissions = sorted(submissions, key=submission_sort_key)
 
             # Find first instance of duplicate for this student
             for i in range(len(sorted_submissions) - 1):
@@ -238,46 +549,177 @@ class JournalValidator:
 
         return list(duplicates.values())
 
-    def process_directory(self, directory_path):
-        """Process all DOCX files in directory"""
-        files = [f for f in os.listdir(directory_path) if f.endswith(".docx")]
+    def find_near_duplicates(self, results):
+        """
+        Find similar submissions, by one student or across students, with MinHash/LSH
+
+        Submissions sharing the same signature are clustered and compared
+        once, through the first submission of their cluster. Returns the
+        clusters of two or more submissions, and the similar cluster pairs.
+        """
+        signed = [result for result in results if result.get("minhash") is not None]
+        positions, signatures = cluster_signatures(
+            [result["minhash"] for result in signed]
+        )
+        clusters = [[signed[idx] for idx in cluster] for cluster in positions]
+        # clusters of two or more submissions are numbered from 1
+        numbers = {}
+        duplicate_clusters = [cluster for cluster in clusters if len(cluster) > 1]
+        for number, cluster in enumerate(duplicate_clusters, start=1):
+            numbers[id(cluster)] = number
+        pairs = find_similar_pairs(signatures, self.similarity_threshold)
+
+        near_duplicates = []
+        for a, b, similarity in pairs:
+            first, second = clusters[a][0], clusters[b][0]
+            same_student = first["student_id"] == second["student_id"]
+            near_duplicates.append(
+                {
+                    "student_id1": first["student_id"],
+                    "name1": first["name"],
+                    "file1": first["filename"],
+                    "student_id2": second["student_id"],
+                    "name2": second["name"],
+                    "file2": second["filename"],
+                    "scope": "same student" if same_student else "cross student",
+                    "similarity": similarity,
+                    "cluster1": numbers.get(id(clusters[a])),
+                    "cluster2": numbers.get(id(clusters[b])),
+                    "results1": clusters[a],
+                    "results2": clusters[b],
+                }
+            )
+        return duplicate_clusters, near_duplicates
+
+    def iter_processed_files(self, paths):
+        """Process files in order, on a process pool unless jobs is 1"""
+        if self.jobs == 1 or len(paths) < 2:
+            for path in paths:
+                yield _process_file_safely(self.file_processor, path)
+            return
+
+        workers = self.jobs or os.cpu_count() or 1
+        # DOCX parsing holds the GIL, so files are spread over processes, in
+        # chunks to keep the per-task overhead low
+        chunksize = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.file_processor.content_analyzer,),
+        ) as executor:
+            yield from executor.map(_process_file_in_worker, paths, chunksize=chunksize)
+
+    def iter_directory_results(self, paths):
+        """Yield the result of every path in order, reusing unchanged files' results"""
+        # checked once, a touched file is read and digested by the check
+        unchanged = set()
+        if self.manifest is not None:
+            unchanged = {path for path in paths if self.manifest.is_unchanged(path)}
+            self.manifest.start()
+        new_paths = [path for path in paths if path not in unchanged]
+        print(
+            f"\nProcessing {len(new_paths)} files"
+            f" ({len(paths) - len(new_paths)} unchanged files skipped)..."
+        )
+
+        # Process files in parallel, results arrive in the order of new_paths
+        processed = iter(
+            tqdm(self.iter_processed_files(new_paths), total=len(new_paths))
+        )
+        for path in paths:
+            if path in unchanged:
+                result = self.manifest.reuse(path)
+            else:
+                result = next(processed)
+                if self.manifest is not None and result is not None:
+                    # written before the cross-file checks add their issues
+                    self.manifest.add(path, result)
+            yield result
+        if self.manifest is not None:
+            self.manifest.finish()
+
+    def process_directory(self, directory_path, on_result=None):
+        """
+        Process all DOCX files in directory
+
+        If on_result is supplied, it receives every file result as soon as it
+        is available, and the returned results only keep what the cross-file
+        checks need, with the issues found by those checks.
+        """
+        files = sorted(f for f in os.listdir(directory_path) if f.endswith(".docx"))
+        paths = [os.path.join(directory_path, file) for file in files]
         results = []
         invalid_files = []
 
-        print(f"\nProcessing {len(files)} files...")
+        # reading and the per-file analysis are interleaved (and possibly
+        # parallel), they are profiled as one stage
+        with profiling.stage("read") as stage:
+            for result in self.iter_directory_results(paths):
+                if result is None:
+                    continue
+                if "student_id" not in result:
+                    invalid_files.append(result["filename"])
+                    continue
+                # Track for duplicate detection, results are aggregated here only,
+                # never in the (possibly parallel) file processing
+                if "content_hash" in result:
+                    self.student_submissions[result["student_id"]].append(
+                        {
+                            "date": result["date"],
+                            "hash": result["content_hash"],
+                            "filename": result["filename"],
+                        }
+                    )
+                if on_result is not None:
+                    on_result(result)
+                    result = self._cross_file_summary(result)
+                results.append(result)
+            stage.rows = len(results)
 
-        # Process files in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [
-                executor.submit(
-                    self.file_processor.process_file, os.path.join(directory_path, file)
-                )
-                for file in files
-            ]
+        with profiling.stage("transform", rows=len(results)):
+            # Stable order regardless of how the files were processed
+            results.sort(
+                key=lambda result: (result["student_id"], *submission_sort_key(result))
+            )
 
-            for future in tqdm(
-                concurrent.futures.as_completed(futures), total=len(files)
-            ):
-                try:
-                    result = future.result()
-                    if "student_id" not in result:
-                        invalid_files.append(result["filename"])
-                        continue
-                    results.append(result)
-                except Exception as e:
-                    print(f"Error processing file: {str(e)}")
-
-        # Find duplicates after processing all files
-        duplicates = self.find_duplicate_submissions()
-
-        # Add duplicate issues to results
-        for dup in duplicates:
+            # Find duplicates after processing all files
+            duplicates = self.find_duplicate_submissions()
+
+            # Add duplicate issues to results, through a student_id -> results index
+            student_results = defaultdict(list)
             for result in results:
-                if result.get("student_id") == dup["student_id"]:
+                student_results[result.get("student_id")].append(result)
+            for dup in duplicates:
+                for result in student_results[dup["student_id"]]:
                     result["issues"].append(
                         f"Duplicate submission with dates: {dup['date1']} and {dup['date2']}"
                     )
 
+            # Flag each submission with its most similar near-duplicate
+            self.near_duplicate_clusters, self.near_duplicates = (
+                self.find_near_duplicates(results)
+            )
+            closest = {}  # result id -> (similarity, result, other filename)
+            for cluster in self.near_duplicate_clusters:
+                for result in cluster:
+                    other = cluster[1] if result is cluster[0] else cluster[0]
+                    closest[id(result)] = (1.0, result, other["filename"])
+            for near in self.near_duplicates:
+                for cluster, other in (
+                    (near["results1"], near["file2"]),
+                    (near["results2"], near["file1"]),
+                ):
+                    for result in cluster:
+                        if (
+                            id(result) not in closest
+                            or near["similarity"] > closest[id(result)][0]
+                        ):
+                            closest[id(result)] = (near["similarity"], result, other)
+            for similarity, result, other in closest.values():
+                result["issues"].append(
+                    f"Near-duplicate of {other} (Jaccard {similarity:.2f})"
+                )
+
         # Add invalid files to results summary
         if invalid_files:
             print(f"\nFound {len(invalid_files)} files with invalid format:")
@@ -288,7 +730,28 @@ class JournalValidator:
 
         return results
 
-    def save_results(self, results, output_file="journal_validation_results.xlsx"):
+    @staticmethod
+    def _cross_file_summary(result):
+        """Fields of a streamed result used by the cross-file checks, without its issues"""
+        minhash = result.get("minhash")
+        return {
+            "filename": result["filename"],
+            "student_id": result["student_id"],
+            "name": result["name"],
+            "date": result.get("date", ""),
+            "word_count": result.get("word_count", 0),
+            # an array takes a fraction of the memory of a list of ints
+            "minhash": None if minhash is None else np.asarray(minhash, np.uint64),
+            "issues": [],
+        }
+
+    def save_results(
+        self,
+        results,
+        output_file="journal_validation_results.xlsx",
+        near_duplicates=(),
+        near_duplicate_clusters=(),
+    ):
         """Save results to Excel file"""
         # Track issues per student to avoid duplicates
         student_issues = defaultdict(dict)  # student_id -> issue_type -> issue_details
@@ -297,52 +760,21 @@ class JournalValidator:
         # Process all results
         for result in results:
             student_id = result.get("student_id", "Unknown")
-            name = result.get("name", "Unknown")
 
             # Process each issue
             for issue in result.get("issues", []):
-                # Determine issue type
-                issue_type = None
-                if "Duplicate submission" in issue:
-                    issue_type = "duplicate"
-                elif "Low word count" in issue:
-                    issue_type = "low_word_count"
-                elif "repetitive patterns" in issue:
-                    issue_type = "repetitive"
-                else:
-                    issue_type = "other"
+                issue_type = get_issue_type(issue)
 
                 # Only store if this type of issue hasn't been recorded for this student
                 if issue_type not in student_issues[student_id]:
-                    student_issues[student_id][issue_type] = {
-                        "Student ID": student_id,
-                        "Name": name,
-                        "Filename": result["filename"],
-                        "Issue": issue,
-                        "Word Count": result.get("word_count", 0),
-                    }
+                    student_issues[student_id][issue_type] = issue_row(result, issue)
 
             # Process repetitive patterns
             if (
                 result.get("repetitive_patterns")
                 and student_id not in student_issues["repetitive"]
             ):
-                patterns_data.append(
-                    {
-                        "Student ID": student_id,
-                        "Name": name,
-                        "Filename": result["filename"],
-                        "Similar Text 1": result["repetitive_patterns"][0][
-                            "paragraph1"
-                        ],
-                        "Similar Text 2": result["repetitive_patterns"][0][
-                            "paragraph2"
-                        ],
-                        "Similarity Score": result["repetitive_patterns"][0][
-                            "similarity"
-                        ],
-                    }
-                )
+                patterns_data.append(pattern_row(result))
 
         # Prepare final issues data
         issues_data = []
@@ -360,22 +792,257 @@ class JournalValidator:
                     writer, sheet_name="Repetitive Patterns", index=False
                 )
 
+            # Write near-duplicate pairs if any found
+            if near_duplicates:
+                pd.DataFrame(
+                    [near_duplicate_row(near) for near in near_duplicates]
+                ).to_excel(writer, sheet_name="Near Duplicates", index=False)
+
+            # Write the submissions of every cluster if any found
+            if near_duplicate_clusters:
+                pd.DataFrame(
+                    [
+                        cluster_row(result, number)
+                        for number, cluster in enumerate(near_duplicate_clusters, 1)
+                        for result in cluster
+                    ]
+                ).to_excel(writer, sheet_name="Near Duplicate Clusters", index=False)
+
+
+def get_issue_type(issue):
+    """Category of an issue, each student gets one Issues row per category"""
+    if "Duplicate submission" in issue:
+        return "duplicate"
+    elif "Near-duplicate" in issue:
+        return "near_duplicate"
+    elif "Low word count" in issue:
+        return "low_word_count"
+    elif "repetitive patterns" in issue:
+        return "repetitive"
+    else:
+        return "other"
+
+
+def issue_row(result, issue):
+    return {
+        "Student ID": result.get("student_id", "Unknown"),
+        "Name": result.get("name", "Unknown"),
+        "Filename": result["filename"],
+        "Issue": issue,
+        "Word Count": result.get("word_count", 0),
+    }
+
+
+def pattern_row(result):
+    pattern = result["repetitive_patterns"][0]
+    return {
+        "Student ID": result.get("student_id", "Unknown"),
+        "Name": result.get("name", "Unknown"),
+        "Filename": result["filename"],
+        "Similar Text 1": pattern["paragraph1"],
+        "Similar Text 2": pattern["paragraph2"],
+        "Similarity Score": pattern["similarity"],
+    }
+
+
+def near_duplicate_row(near):
+    return {
+        "Student ID 1": near["student_id1"],
+        "Name 1": near["name1"],
+        "Filename 1": near["file1"],
+        "Student ID 2": near["student_id2"],
+        "Name 2": near["name2"],
+        "Filename 2": near["file2"],
+        "Scope": near["scope"],
+        "Jaccard": near["similarity"],
+        "Cluster 1": near["cluster1"],
+        "Cluster 2": near["cluster2"],
+    }
+
+
+def cluster_row(result, number):
+    return {
+        "Cluster": number,
+        "Student ID": result.get("student_id", "Unknown"),
+        "Name": result.get("name", "Unknown"),
+        "Filename": result["filename"],
+    }
+
+
+class StreamingResultsWriter:
+    """
+    Writes screening results row by row with an openpyxl write-only workbook
+
+    Rows are flushed to disk as they are appended, so memory stays flat no
+    matter how many submissions are screened. Unlike save_results, the
+    repetitive pattern rows follow the processing order. The Issues rows are
+    the ones save_results picks, in the same order: one row per student and
+    issue type, kept until the writer is closed.
+    """
+
+    ISSUE_COLUMNS = ["Student ID", "Name", "Filename", "Issue", "Word Count"]
+    PATTERN_COLUMNS = [
+        "Student ID",
+        "Name",
+        "Filename",
+        "Similar Text 1",
+        "Similar Text 2",
+        "Similarity Score",
+    ]
+    NEAR_DUPLICATE_COLUMNS = [
+        "Student ID 1",
+        "Name 1",
+        "Filename 1",
+        "Student ID 2",
+        "Name 2",
+        "Filename 2",
+        "Scope",
+        "Jaccard",
+        "Cluster 1",
+        "Cluster 2",
+    ]
+    CLUSTER_COLUMNS = ["Cluster", "Student ID", "Name", "Filename"]
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.workbook = Workbook(write_only=True)
+        self.issues_sheet = self.workbook.create_sheet("Issues")
+        self.issues_sheet.append(self.ISSUE_COLUMNS)
+        self.patterns_sheet = None
+        self.near_duplicates_sheet = None
+        self.clusters_sheet = None
+        # student_id -> issue type -> (order key, Issues row) of the earliest
+        # submission with that issue, as picked by save_results
+        self.student_issues = defaultdict(dict)
+
+    @staticmethod
+    def _append(sheet, columns, row):
+        sheet.append([row[column] for column in columns])
+
+    def write_result(self, result, cross_file=False):
+        """
+        Write the issues and repetitive patterns of one file result
+
+        cross_file results only hold the issues found by the cross-file
+        checks, which save_results sees after the per-file issues.
+        """
+        student_id = result.get("student_id", "Unknown")
+        submission_key = submission_sort_key(result)
+        for idx, issue in enumerate(result.get("issues", [])):
+            issue_type = get_issue_type(issue)
+            key = (submission_key, cross_file, idx)
+            issues = self.student_issues[student_id]
+            if issue_type not in issues or key < issues[issue_type][0]:
+                issues[issue_type] = (key, issue_row(result, issue))
+
+        if result.get("repetitive_patterns"):
+            if self.patterns_sheet is None:
+                self.patterns_sheet = self.workbook.create_sheet("Repetitive Patterns")
+                self.patterns_sheet.append(self.PATTERN_COLUMNS)
+            self._append(self.patterns_sheet, self.PATTERN_COLUMNS, pattern_row(result))
+
+    def write_near_duplicates(self, near_duplicates):
+        for near in near_duplicates:
+            if self.near_duplicates_sheet is None:
+                self.near_duplicates_sheet = self.workbook.create_sheet(
+                    "Near Duplicates"
+                )
+                self.near_duplicates_sheet.append(self.NEAR_DUPLICATE_COLUMNS)
+            self._append(
+                self.near_duplicates_sheet,
+                self.NEAR_DUPLICATE_COLUMNS,
+                near_duplicate_row(near),
+            )
+
+    def write_clusters(self, near_duplicate_clusters):
+        for number, cluster in enumerate(near_duplicate_clusters, start=1):
+            if self.clusters_sheet is None:
+                self.clusters_sheet = self.workbook.create_sheet(
+                    "Near Duplicate Clusters"
+                )
+                self.clusters_sheet.append(self.CLUSTER_COLUMNS)
+            for result in cluster:
+                self._append(
+                    self.clusters_sheet,
+                    self.CLUSTER_COLUMNS,
+                    cluster_row(result, number),
+                )
+
+    def close(self):
+        # save_results orders the students, then their issues by submission
+        for student_id in sorted(self.student_issues):
+            for _, row in sorted(
+                self.student_issues[student_id].values(), key=lambda item: item[0]
+            ):
+                self._append(self.issues_sheet, self.ISSUE_COLUMNS, row)
+        self.workbook.save(self.output_file)
+
 
-def main(journal_dir: str, output_file: str):
-    validator = JournalValidator()
+def main(
+    journal_dir: str,
+    output_file: str,
+    jobs: int = 0,
+    use_manifest: bool = True,
+    similarity_threshold: float = 0.8,
+    fuzzy_paragraphs: bool = False,
+    paragraph_threshold: float = 0.8,
+    headers_file: FileType | None = None,
+    tokenizer: Tokenizer = Tokenizer.WHITESPACE,
+    stream_output: bool = False,
+):
+    template_headers = None
+    if headers_file is not None:
+        template_headers = json.load(headers_file)
+        if not isinstance(template_headers, list) or not all(
+            isinstance(header, str) for header in template_headers
+        ):
+            raise ValueError("Headers file must contain a JSON list of strings")
+
+    manifest_path = ScreeningManifest.path_for(output_file) if use_manifest else None
+    content_analyzer = ContentAnalyzer(
+        fuzzy_paragraphs, paragraph_threshold, template_headers, tokenizer
+    )
+    validator = JournalValidator(
+        jobs, manifest_path, similarity_threshold, content_analyzer
+    )
     # Process all files
     print("Starting journal validation...")
-    results = validator.process_directory(journal_dir)
+    if stream_output:
+        # Write per-file rows while processing, then the cross-file issues
+        writer = StreamingResultsWriter(output_file)
+        results = validator.process_directory(journal_dir, writer.write_result)
+        with profiling.stage("write", rows=len(results)):
+            for result in results:
+                writer.write_result(result, cross_file=True)
+            writer.write_near_duplicates(validator.near_duplicates)
+            writer.write_clusters(validator.near_duplicate_clusters)
+            writer.close()
+        has_patterns = writer.patterns_sheet is not None
+    else:
+        results = validator.process_directory(journal_dir)
 
-    # Save results
-    validator.save_results(results, output_file)
+        # Save results
+        with profiling.stage("write", rows=len(results)):
+            validator.save_results(
+                results,
+                output_file,
+                validator.near_duplicates,
+                validator.near_duplicate_clusters,
+            )
+        has_patterns = any(r.get("repetitive_patterns") for r in results)
 
     print(f"\nValidation complete! Results saved to {output_file}")
     print("Please check the Excel file for:")
     print(
         "- 'Issues' sheet: All detected issues including duplicates and low word count"
     )
-    if any(r.get("repetitive_patterns") for r in results):
+    if has_patterns:
         print(
             "- 'Repetitive Patterns' sheet: Detected copy-paste patterns within documents"
         )
+    if validator.near_duplicates:
+        print(
+            "- 'Near Duplicates' sheet: Similar submission pairs within and across students"
+        )
+    if validator.near_duplicate_clusters:
+        print("- 'Near Duplicate Clusters' sheet: Submissions sharing the same content")
@@ -1,14 +1,26 @@
-import glob
-import itertools
 import pandas as pd
 
-from otomasi.utilities.files import read_df, write_df
-from otomasi.utilities.xlsx import extract_table, find_anchor
+from otomasi.utilities import profiling
+from otomasi.utilities.files import expand_globs, read_df, read_dfs, write_df
+from otomasi.utilities.formats import get_extension
+from otomasi.utilities.xlsx import (
+    AnchorMatch,
+    extract_table,
+    find_anchor,
+    read_anchored_xlsx,
+)
 
 
-def _extract_data(df: pd.DataFrame, anchor_header: str) -> pd.DataFrame:
-    (row, col) = find_anchor(df, anchor_header)
-    _df = df.iloc[row:, col:]
+def _extract_data(
+    df: pd.DataFrame,
+    anchor_header: str,
+    on_multiple: AnchorMatch = AnchorMatch.FIRST,
+) -> pd.DataFrame:
+    (row, col) = find_anchor(df, anchor_header, on_multiple=on_multiple)
+    return _extract_anchored(df.iloc[row:, col:], anchor_header)
+
+
+def _extract_anchored(_df: pd.DataFrame, anchor_header: str) -> pd.DataFrame:
     # Extract headers
     main_headers = (
         _df.iloc[:1].astype("string").ffill(axis=1).fillna("").values.tolist()[0]
@@ -28,6 +40,13 @@ def _extract_data(df: pd.DataFrame, anchor_header: str) -> pd.DataFrame:
     return data
 
 
+def read_data_streaming(path: str, anchor_header: str) -> pd.DataFrame:
+    if get_extension(path) != "xlsx":
+        return _extract_data(read_df(path), anchor_header)
+    table, _ = read_anchored_xlsx(path, anchor_header)
+    return _extract_anchored(table, anchor_header)
+
+
 def filter_valid_df(
     df: pd.DataFrame, path: str, raise_error: bool = False
 ) -> pd.DataFrame | None:
@@ -42,16 +61,44 @@ def filter_valid_df(
     return df
 
 
-def main(globs: list[str], header: str, out: str):
+def main(
+    globs: list[str],
+    header: str,
+    out: str,
+    jobs: int = 1,
+    stream: bool = False,
+    on_multiple: AnchorMatch = AnchorMatch.FIRST,
+):
     # extract globs and flatten into path list
-    paths_lists = [glob.glob(_glob, recursive=True) for _glob in globs]
-    paths = list(itertools.chain(*paths_lists))
+    paths = expand_globs(globs)
 
-    # read dataframes
-    mentor_grades = [(read_df(path), path) for path in paths]
-    extracted_dfs = [(_extract_data(df, header), path) for df, path in mentor_grades]
+    # read dataframes, files that can't be read are reported and skipped
+    if stream:
+        # extract the tables while the sheets are streamed in
+        with profiling.stage("read") as stage:
+            read_results = read_dfs(
+                paths, jobs, reader=read_data_streaming, anchor_header=header
+            )
+            extracted_dfs = [(r.df, r.path) for r in read_results if r.error is None]
+            stage.rows = sum(len(df) for df, _ in extracted_dfs)
+    else:
+        with profiling.stage("read") as stage:
+            read_results = read_dfs(paths, jobs)
+            mentor_grades = [(r.df, r.path) for r in read_results if r.error is None]
+            stage.rows = sum(len(df) for df, _ in mentor_grades)
+        with profiling.stage("extract") as stage:
+            extracted_dfs = [
+                (_extract_data(df, header, on_multiple), path)
+                for df, path in mentor_grades
+            ]
+            stage.rows = sum(len(df) for df, _ in extracted_dfs)
+    if not extracted_dfs:
+        raise ValueError("none of the input files could be read")
 
-    valid_dfs = [filter_valid_df(df, _path) for df, _path in extracted_dfs]
+    with profiling.stage("transform") as stage:
+        valid_dfs = [filter_valid_df(df, _path) for df, _path in extracted_dfs]
+        compiled_grades = pd.concat(valid_dfs, join="outer", ignore_index=True)
+        stage.rows = len(compiled_grades)
 
-    compiled_grades = pd.concat(valid_dfs, join="outer", ignore_index=True)
-    write_df(compiled_grades, out, index=False)
+    with profiling.stage("write", rows=len(compiled_grades)):
+        write_df(compiled_grades, out, index=False)
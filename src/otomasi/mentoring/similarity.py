@@ -0,0 +1,183 @@
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+
+# Permutations are (a * x + b) mod MERSENNE_PRIME over 32-bit shingle hashes,
+# which keeps every intermediate value below 2^64
+MERSENNE_PRIME = (1 << 31) - 1
+WORD_RE = re.compile(r"\w+")
+# Texts with fewer shingles are too short to compare, they are already
+# reported for their low word count
+MIN_SHINGLES = 10
+# Minimum probability that LSH proposes a pair exactly at the threshold
+LSH_RECALL = 0.99
+
+
+class MinHasher:
+    """Builds MinHash signatures of texts from their word shingles"""
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1, min_shingles=MIN_SHINGLES):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.min_shingles = min_shingles
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def settings(self):
+        return {
+            "num_perm": self.num_perm,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+            "min_shingles": self.min_shingles,
+        }
+
+    def shingles(self, text):
+        """Hashes of the overlapping shingle_size word sequences of text"""
+        words = WORD_RE.findall(text.lower())
+        if not words:
+            return set()
+        # texts shorter than a shingle become a single shingle
+        size = min(self.shingle_size, len(words))
+        return {
+            zlib.crc32(" ".join(words[i : i + size]).encode())
+            for i in range(len(words) - size + 1)
+        }
+
+    def signature(self, text):
+        """MinHash signature of text, or None if it has less than min_shingles shingles"""
+        shingles = self.shingles(text)
+        if len(shingles) < self.min_shingles:
+            return None
+        return self.signature_from_shingles(shingles)
+
+    def signature_from_shingles(self, shingles):
+        """MinHash signature of a set of 32-bit shingle hashes, or None if empty"""
+        if not shingles:
+            return None
+        hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+def char_shingles(text, size=5):
+    """Hashes of the overlapping size character sequences of text"""
+    size = min(size, len(text))
+    return {
+        zlib.crc32(text[i : i + size].encode()) for i in range(len(text) - size + 1)
+    }
+
+
+def jaccard(first, second):
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def lsh_bands(num_perm, threshold):
+    """
+    Number of LSH bands of signatures of num_perm for a similarity threshold
+
+    A pair of Jaccard similarity s shares a band of r rows with probability
+    s^r, so b bands propose it with probability 1 - (1 - s^r)^b. The fewest
+    bands (the least candidates) proposing pairs at threshold with at least
+    LSH_RECALL probability are chosen, among the divisors of num_perm.
+    Raises ValueError if even single row bands can't.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"Similarity threshold must be within (0, 1], got {threshold}")
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands != 0:
+            continue
+        rows = num_perm // bands
+        if 1 - (1 - threshold**rows) ** bands >= LSH_RECALL:
+            return bands
+    raise ValueError(
+        f"Similarity threshold {threshold} is too low for signatures of {num_perm}"
+    )
+
+
+def candidate_pairs(signatures, threshold=0.8, bands=None):
+    """
+    Pairs (i, j), i < j, of signatures sharing an identical LSH band
+
+    The work grows with the number of signatures and proposed pairs instead
+    of all pairs, but identical signatures are proposed with each other, see
+    cluster_signatures.
+    """
+    if len(signatures) < 2:
+        return set()
+    matrix = np.asarray(signatures, dtype=np.uint64)
+    num_perm = matrix.shape[1]
+    if bands is None:
+        bands = lsh_bands(num_perm, threshold)
+    if num_perm % bands != 0:
+        raise ValueError(f"{bands} bands do not divide signatures of {num_perm}")
+    rows = num_perm // bands
+
+    candidates = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        band_matrix = np.ascontiguousarray(matrix[:, band * rows : (band + 1) * rows])
+        for idx, band_row in enumerate(band_matrix):
+            buckets[band_row.tobytes()].append(idx)
+        for members in buckets.values():
+            if len(members) > 1:
+                candidates.update(combinations(members, 2))
+    return candidates
+
+
+def find_similar_pairs(signatures, threshold=0.8, bands=None):
+    """
+    Find the pairs of signatures whose estimated Jaccard similarity reaches threshold
+
+    Parameters
+    ----------
+    signatures:
+        Equally sized MinHash signatures, one per document
+    threshold: default 0.8
+        Minimum estimated Jaccard similarity of a reported pair
+    bands: default None
+        Number of LSH bands, must divide the signature length. Derived from
+        threshold by lsh_bands by default
+
+    Returns
+    -------
+    A list of (i, j, similarity) tuples with i < j, sorted by i then j
+    """
+    candidates = candidate_pairs(signatures, threshold, bands)
+    if not candidates:
+        return []
+    matrix = np.asarray(signatures, dtype=np.uint64)
+    pairs = []
+    for i, j in sorted(candidates):
+        similarity = float(np.mean(matrix[i] == matrix[j]))
+        if similarity >= threshold:
+            pairs.append((i, j, similarity))
+    return pairs
+
+
+def cluster_signatures(signatures):
+    """
+    Group the positions of identical signatures
+
+    Returns the clusters ordered by their first position, and one signature
+    per cluster. Comparing the clusters instead of the signatures keeps a
+    batch of identical documents from turning into all of their pairs.
+    """
+    if len(signatures) == 0:
+        return [], []
+    matrix = np.asarray(signatures, dtype=np.uint64)
+    _, first, inverse = np.unique(
+        matrix, axis=0, return_index=True, return_inverse=True
+    )
+    # clusters are keyed by their first position
+    clusters = defaultdict(list)
+    for idx, cluster in enumerate(inverse.ravel()):
+        clusters[first[cluster]].append(idx)
+    firsts = np.sort(first)
+    return [clusters[position] for position in firsts], matrix[firsts]
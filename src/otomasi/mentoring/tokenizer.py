@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class Tokenizer(Enum):
+    WHITESPACE = "whitespace"
+    REGEX = "regex"
+    NLTK = "nltk"
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class AnchorMatch(Enum):
+    FIRST = "first"
+    LAST = "last"
+    ERROR = "error"
+
+    def __str__(self):
+        return self.value
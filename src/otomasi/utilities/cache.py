@@ -0,0 +1,166 @@
+import hashlib
+import os
+import pickle
+
+# pandas is not imported here so the CLI can configure the cache cheaply,
+# cached values are pickled as is (protocol 5 keeps numpy buffers zero-copy)
+PICKLE_PROTOCOL = 5
+DEFAULT_MAX_SIZE_MB = 1024
+ENTRY_SUFFIX = ".pkl"
+
+
+def default_cache_dir() -> str:
+    if "OTOMASI_CACHE_DIR" in os.environ:
+        return os.environ["OTOMASI_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "otomasi")
+
+
+def default_max_bytes() -> int:
+    size = os.environ.get("OTOMASI_CACHE_SIZE", DEFAULT_MAX_SIZE_MB)
+    try:
+        return int(size) * 1024 * 1024
+    except ValueError:
+        print(
+            f"warning: invalid OTOMASI_CACHE_SIZE {size!r}, "
+            f"using the default of {DEFAULT_MAX_SIZE_MB} MB"
+        )
+        return DEFAULT_MAX_SIZE_MB * 1024 * 1024
+
+
+class DiskCache:
+    """Size bounded LRU cache of parsed files, stored as pickles in a directory"""
+
+    def __init__(
+        self, directory: str, max_bytes: int | None = None, enabled: bool = True
+    ):
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self.enabled = enabled
+
+    @property
+    def max_bytes(self) -> int:
+        # read from the environment on first use, so a bad OTOMASI_CACHE_SIZE
+        # can't break importing the package
+        if self._max_bytes is None:
+            self._max_bytes = default_max_bytes()
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        self._max_bytes = max_bytes
+
+    def key(self, file_path, **options) -> str | None:
+        """
+        Build the cache key of a file read, or None if the read can't be cached
+
+        The key covers the absolute path, modification time and size of the
+        file, so editing the file invalidates its entries, and every option
+        affecting the parse result (dtype, encoding, sheet, ...).
+        """
+        if not self.enabled:
+            return None
+        try:
+            path = os.path.abspath(file_path)
+            stat = os.stat(path)
+        except (TypeError, ValueError, OSError):
+            # file objects, URLs and missing files are read uncached
+            return None
+        descriptor = repr(
+            (path, stat.st_mtime_ns, stat.st_size, sorted(options.items()))
+        )
+        return hashlib.sha256(descriptor.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    def get(self, key: str):
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # corrupted or incompatible entry, drop it and read the file again
+            self._remove(entry_path)
+            return None
+        # bump the modification time, it doubles as the LRU timestamp
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value):
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=PICKLE_PROTOCOL)
+            # atomic rename, concurrent readers never see a partial entry
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"warning: unable to write cache entry: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = DiskCache(default_cache_dir())
+
+
+def get_cache() -> DiskCache:
+    return _cache
+
+
+def configure(
+    enabled: bool | None = None,
+    directory: str | None = None,
+    max_bytes: int | None = None,
+):
+    if enabled is not None:
+        _cache.enabled = enabled
+    if directory is not None:
+        _cache.directory = directory
+    if max_bytes is not None:
+        _cache.max_bytes = max_bytes
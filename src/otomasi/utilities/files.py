@@ -1,70 +1,222 @@
+import codecs
 import glob
-from enum import Enum
 import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, NamedTuple
 import pandas as pd
+from openpyxl.styles import Alignment, Border, Font, Side
+
+from otomasi.utilities.cache import configure as configure_cache
+from otomasi.utilities.cache import get_cache
+from otomasi.utilities.formats import DfInFormat, DfOutFormat, get_extension
 
 QUOTE_STRINGS = getattr(csv, "QUOTE_STRINGS", csv.QUOTE_NONNUMERIC)
 
+# Candidate encodings for CSV files without a byte order mark, in order
+SNIFF_ENCODINGS = ("utf-8", "cp1252", "latin-1")
+SNIFF_SIZE = 64 * 1024
+# UTF-32 marks come first since the UTF-32-LE mark starts with the UTF-16-LE one
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# file (path, mtime, size) -> detected encoding
+_detected_encodings: dict[tuple[str, int, int], str] = {}
+
 
-class DfInFormat(Enum):
-    CSV = "csv"
-    JSON = "json"
-    Excel = "xlsx"
-    EMPTY = ""
+def read_df(
+    file_path: str,
+    file_format: DfInFormat | None = None,
+    dtype: dict = {},
+    use_cache: bool = True,
+    **kwargs,
+):
+    if file_format is None:
+        file_format = DfInFormat(get_extension(file_path))
+    # parsed files are cached on disk, keyed by the file state and read options
+    cache = get_cache()
+    key = None
+    if use_cache:
+        key = cache.key(
+            file_path,
+            file_format=file_format.value,
+            dtype=dtype,
+            pandas=pd.__version__,
+            **kwargs,
+        )
+    if key is not None:
+        df = cache.get(key)
+        if df is not None:
+            return df
+    df = _parse_df(file_path, file_format, dtype, **kwargs)
+    if key is not None:
+        cache.put(key, df)
+    return df
 
-    def __str__(self):
-        return self.value
+
+def _parse_df(file_path: str, file_format: DfInFormat, dtype: dict, **kwargs):
+    match file_format:
+        case DfInFormat.CSV:
+            if "encoding" in kwargs or not isinstance(file_path, (str, os.PathLike)):
+                df = pd.read_csv(file_path, dtype=dtype, **kwargs)
+            else:
+                df = _read_csv_detected(file_path, dtype, **kwargs)
+        case DfInFormat.JSON:
+            df = pd.read_json(file_path, dtype=dtype, **kwargs)
+        case DfInFormat.Excel:
+            df = pd.read_excel(file_path, dtype=dtype, **kwargs)
+        case _:
+            raise TypeError("file format not supported")
+    return df
 
 
-class DfOutFormat(Enum):
-    CSV = "csv"
-    JSON = "json"
-    Excel = "xlsx"
-    Markdown = "md"
-    EMPTY = ""
+def _read_csv_detected(file_path: str, dtype: dict, **kwargs):
+    encoding = detect_encoding(file_path)
+    try:
+        return pd.read_csv(file_path, dtype=dtype, encoding=encoding, **kwargs)
+    except UnicodeDecodeError as e:
+        # the sniffed prefix decoded fine but the rest of the file does not,
+        # fall back to the next candidates
+        last_exc = e
+    candidates = ()
+    if encoding in SNIFF_ENCODINGS:
+        candidates = SNIFF_ENCODINGS[SNIFF_ENCODINGS.index(encoding) + 1 :]
+    for enc in candidates:
+        try:
+            df = pd.read_csv(file_path, dtype=dtype, encoding=enc, **kwargs)
+            _detected_encodings[_encoding_key(file_path)] = enc
+            return df
+        except UnicodeDecodeError as e:
+            last_exc = e
+    # re-raise the last UnicodeDecodeError if none worked
+    raise last_exc
 
-    def __str__(self):
-        return self.value
 
+def _encoding_key(file_path: str):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
 
-def get_extension(file_path: str) -> str:
-    parts = file_path.rpartition(".")
-    # no separator with the dot "." for extension, return empty
-    if parts[0] == "":
-        return ""
-    return parts[-1]
 
+def detect_encoding(file_path: str, sample_size: int = SNIFF_SIZE) -> str:
+    """
+    Detect the text encoding of a file from a bounded prefix of its content
 
-def read_glob_df(glob_str: str, recursive: bool = False):
-    paths = glob.glob(glob_str, recursive=recursive)
-    return [read_df(_path) for _path in paths]
+    Byte order marks are checked first, then the prefix is trial-decoded with
+    each of SNIFF_ENCODINGS in order. The detected encoding is remembered for
+    the file (until it is modified), so repeated reads don't sniff again.
+    """
+    key = _encoding_key(file_path)
+    if key in _detected_encodings:
+        return _detected_encodings[key]
 
+    with open(file_path, "rb") as f:
+        sample = f.read(sample_size)
+    # a full sample might end in the middle of a multi-byte character
+    is_whole_file = len(sample) < sample_size
 
-def read_df(file_path: str, file_format: DfInFormat | None = None, dtype: dict = {}, **kwargs):
-    if file_format is None:
-        file_format = DfInFormat(get_extension(file_path))
-    match file_format:
-        case DfInFormat.CSV:
+    encoding = None
+    for bom, bom_encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            encoding = bom_encoding
+            break
+    else:
+        for candidate in SNIFF_ENCODINGS:
+            decoder = codecs.getincrementaldecoder(candidate)()
             try:
-                df = pd.read_csv(file_path, dtype=dtype, **kwargs)
+                decoder.decode(sample, final=is_whole_file)
             except UnicodeDecodeError:
-                last_exc = None
-                for enc in ("utf-8", "cp1252", "latin-1"):
-                    try:
-                        df = pd.read_csv(file_path, dtype=dtype, encoding=enc, **kwargs)
-                        break
-                    except UnicodeDecodeError as e:
-                        last_exc = e
-                else:
-                    # re-raise the last UnicodeDecodeError if none worked
-                    raise last_exc
-        case DfInFormat.JSON:
-            df = pd.read_json(file_path, dtype=dtype)
-        case DfInFormat.Excel:
-            df = pd.read_excel(file_path, dtype=dtype)
-        case _:
-            raise TypeError("file format not supported")
-    return df
+                continue
+            encoding = candidate
+            break
+    # latin-1 decodes any byte sequence, so one of the candidates always matches
+    assert encoding is not None
+
+    _detected_encodings[key] = encoding
+    return encoding
+
+
+class ReadResult(NamedTuple):
+    path: str
+    df: pd.DataFrame | None
+    error: str | None
+
+
+def expand_globs(globs: Iterable[str], recursive: bool = True) -> list[str]:
+    """
+    Expand glob patterns into a flat list of paths, keeping the pattern order
+
+    Plain paths are kept even when they don't exist, so reading them reports
+    the missing file instead of silently skipping it.
+    """
+    paths: list[str] = []
+    for _glob in globs:
+        if glob.has_magic(_glob):
+            paths.extend(sorted(glob.glob(_glob, recursive=recursive)))
+        else:
+            paths.append(_glob)
+    return paths
+
+
+def _read_task(task: tuple[Callable, str, dict]) -> ReadResult:
+    reader, path, kwargs = task
+    try:
+        return ReadResult(path, reader(path, **kwargs), None)
+    except Exception as e:
+        # exceptions are returned as text, they are not always picklable
+        return ReadResult(path, None, f"{type(e).__name__}: {e}")
+
+
+def read_dfs(
+    paths: list[str],
+    jobs: int = 1,
+    reader: Callable[..., pd.DataFrame] = read_df,
+    **kwargs,
+) -> list[ReadResult]:
+    """
+    Read several files, optionally in parallel on a process pool
+
+    Parameters
+    ----------
+    paths:
+        Files to be read, results are returned in the same order
+    jobs: default 1
+        Number of worker processes, 1 reads serially in this process and
+        0 uses one worker per CPU
+    reader: default read_df
+        Picklable function called as reader(path, **kwargs) for every file
+    kwargs:
+        Extra read options passed to the reader
+
+    A file that fails to be read doesn't abort the batch, its error is
+    reported and returned in its ReadResult instead.
+    """
+    tasks = [(reader, path, kwargs) for path in paths]
+    if jobs == 1 or len(tasks) < 2:
+        results = [_read_task(task) for task in tasks]
+    else:
+        # share the cache settings with the workers, even when they are spawned
+        cache = get_cache()
+        with ProcessPoolExecutor(
+            max_workers=jobs or None,
+            initializer=configure_cache,
+            initargs=(cache.enabled, cache.directory, cache.max_bytes),
+        ) as executor:
+            # map keeps the results in the order of the paths
+            results = list(executor.map(_read_task, tasks))
+
+    for result in results:
+        if result.error is not None:
+            print(f"error: unable to read {result.path}: {result.error}")
+    return results
+
+
+def read_glob_df(glob_str: str, recursive: bool = False, jobs: int = 1):
+    paths = expand_globs([glob_str], recursive=recursive)
+    return [result.df for result in read_dfs(paths, jobs) if result.df is not None]
 
 
 def write_df(
@@ -85,7 +237,62 @@ def write_df(
             df.to_excel(output_path, index=index, **kwargs)
         case DfOutFormat.Markdown:
             df.to_markdown(output_path, index=index)
+        case DfOutFormat.Parquet:
+            # raises ImportError unless pyarrow or fastparquet is installed
+            df.to_parquet(output_path, index=index, **kwargs)
         case _:
             df.to_csv(
                 f"{output_path}.csv", index=index, quoting=QUOTE_STRINGS, **kwargs
             )
+
+
+# style of the header and index cells written by DataFrame.to_excel
+_THIN = Side(style="thin")
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(top=_THIN, right=_THIN, bottom=_THIN, left=_THIN)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+
+def _style_header(cell):
+    cell.font = HEADER_FONT
+    cell.border = HEADER_BORDER
+    cell.alignment = HEADER_ALIGNMENT
+
+
+def write_sheets(
+    sheets: dict[str, pd.DataFrame],
+    output_path: str,
+    index: bool = True,
+):
+    """
+    Write every DataFrame of sheets to its own sheet of one xlsx workbook
+
+    The rows are appended to a new worksheet of the writer's workbook, as
+    DataFrame.to_excel looks every sheet up by name on each call, which makes
+    writing a workbook cubic in its sheet count.
+    """
+    if get_extension(output_path) != DfOutFormat.Excel.value:
+        raise ValueError(
+            f"several sheets can only be written to an xlsx file: {output_path}"
+        )
+    # a single writer keeps the workbook open until every sheet is written
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        for sheet_name, df in sheets.items():
+            header = list(df.columns)
+            index_levels = 0
+            if index:
+                header = [*df.index.names, *header]
+                index_levels = df.index.nlevels
+                df = df.reset_index(allow_duplicates=True)
+            # python scalars, missing values are empty strings as in to_excel
+            values = df.astype(object).where(df.notna(), "")
+            sheet = writer.book.create_sheet(sheet_name)
+            sheet.append(header)
+            for row in values.itertuples(index=False, name=None):
+                sheet.append(row)
+            for column, label in enumerate(header, start=1):
+                if label is not None:
+                    _style_header(sheet.cell(1, column))
+            for row in range(2, len(df) + 2):
+                for column in range(1, index_levels + 1):
+                    _style_header(sheet.cell(row, column))
@@ -0,0 +1,31 @@
+from enum import Enum
+
+
+class DfInFormat(Enum):
+    CSV = "csv"
+    JSON = "json"
+    Excel = "xlsx"
+    EMPTY = ""
+
+    def __str__(self):
+        return self.value
+
+
+class DfOutFormat(Enum):
+    CSV = "csv"
+    JSON = "json"
+    Excel = "xlsx"
+    Markdown = "md"
+    Parquet = "parquet"
+    EMPTY = ""
+
+    def __str__(self):
+        return self.value
+
+
+def get_extension(file_path: str) -> str:
+    parts = file_path.rpartition(".")
+    # no separator with the dot "." for extension, return empty
+    if parts[0] == "":
+        return ""
+    return parts[-1]
@@ -0,0 +1,145 @@
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak RSS is not reported there
+    resource = None
+
+# pandas is not imported here either, the CLI enables profiling before any
+# subcommand module is loaded
+
+STAGE_COLUMNS = [
+    "stage",
+    "wall (s)",
+    "cpu (s)",
+    "peak RSS (MB)",
+    "peak traced (MB)",
+    "rows",
+]
+
+
+def peak_rss_mb() -> float | None:
+    """High-water mark of the resident memory of this process"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+class StageRecord:
+    """Measurements of one profiled stage, rows is filled in by the stage itself"""
+
+    def __init__(self, name: str, rows: int | None = None):
+        self.name = name
+        self.rows = rows
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss = None
+        self.peak_traced = None
+
+    def as_dict(self) -> dict:
+        return {
+            "stage": self.name,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "peak_rss_mb": self.peak_rss,
+            "peak_traced_mb": self.peak_traced,
+            "rows": self.rows,
+        }
+
+
+class Profile:
+    """Stage records of one run, in the order the stages finished"""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.records: list[StageRecord] = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int | None = None):
+        record = StageRecord(name, rows)
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # stages are not nested, the peak is tracked per stage, above the
+            # memory still held from the imports and earlier stages
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            # CPU time of worker processes is not included
+            record.cpu = time.process_time() - cpu
+            record.wall = time.perf_counter() - wall
+            record.peak_rss = peak_rss_mb()
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - traced_start
+                record.peak_traced = peak / 1024**2
+            self.records.append(record)
+
+    def totals(self) -> dict[str, float]:
+        """Wall time per stage name"""
+        totals: dict[str, float] = {}
+        for record in self.records:
+            totals[record.name] = totals.get(record.name, 0.0) + record.wall
+        return totals
+
+    def summary(self) -> str:
+        from tabulate import tabulate
+
+        rows = [
+            [r.name, r.wall, r.cpu, r.peak_rss, r.peak_traced, r.rows]
+            for r in self.records
+        ]
+        return tabulate(rows, headers=STAGE_COLUMNS, floatfmt=".3f", missingval="-")
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump([r.as_dict() for r in self.records], f, indent=2)
+
+
+_profile: Profile | None = None
+
+
+def enable(trace_memory: bool = True) -> Profile:
+    """
+    Start recording the stages of the running command
+
+    trace_memory also starts tracemalloc to report the peak Python allocations
+    of every stage, which slows allocation heavy code down noticeably.
+    """
+    global _profile
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _profile = Profile(trace_memory)
+    return _profile
+
+
+def disable() -> Profile | None:
+    global _profile
+    profile, _profile = _profile, None
+    if profile is not None and profile.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profile
+
+
+def get_profile() -> Profile | None:
+    return _profile
+
+
+def stage(name: str, rows: int | None = None):
+    """
+    Context manager measuring a read, transform or write stage of a command
+
+    Yields a StageRecord whose rows can be set to the number of processed
+    rows. Does nothing unless profiling is enabled.
+    """
+    if _profile is None:
+        return contextlib.nullcontext(StageRecord(name, rows))
+    return _profile.stage(name, rows)
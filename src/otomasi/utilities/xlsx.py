@@ -1,10 +1,72 @@
 from typing import Tuple
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
 
+from otomasi.utilities.anchor import AnchorMatch
 
-def find_anchor(df: pd.DataFrame, anchor: str) -> Tuple[int, int]:
-    anchor_loc = df[df.eq(anchor)].dropna(axis=1, how="all").dropna(how="all")
-    return (anchor_loc.index.item(), df.columns.get_loc(anchor_loc.columns.item()))  # type: ignore
+# Rows compared at once while looking for an anchor
+ANCHOR_BLOCK_ROWS = 256
+
+
+def find_anchor(
+    df: pd.DataFrame,
+    anchor: str,
+    max_search_rows: int | None = None,
+    on_multiple: AnchorMatch = AnchorMatch.FIRST,
+) -> Tuple[int, int]:
+    """
+    Find the (row, column) position of the cell containing anchor
+
+    The cells are compared in blocks of ANCHOR_BLOCK_ROWS rows, so only one
+    block sized temporary exists at a time and the scan stops at the first
+    block containing a match, unless every match is needed.
+
+    Parameters
+    ----------
+    df:
+        The unstructured Dataframe to be searched
+    anchor:
+        Value of the cell to be found
+    max_search_rows: default None
+        If supplied, only search the first max_search_rows rows
+    on_multiple: default AnchorMatch.FIRST
+        Which match to return if the anchor appears more than once: the first
+        or last one in row-major order, or raise a ValueError listing them
+    """
+    n_rows = len(df) if max_search_rows is None else min(len(df), max_search_rows)
+    starts = range(0, n_rows, ANCHOR_BLOCK_ROWS)
+    if on_multiple == AnchorMatch.LAST:
+        # scan from the bottom so the last match is also found early
+        starts = reversed(starts)
+
+    matches: list[Tuple[int, int]] = []
+    for start in starts:
+        end = min(start + ANCHOR_BLOCK_ROWS, n_rows)
+        # missing values become None, comparing pd.NA would not give a bool
+        block = df.iloc[start:end].to_numpy(dtype=object, na_value=None)
+        rows, cols = np.nonzero(block == anchor)
+        if len(rows) == 0:
+            continue
+        match on_multiple:
+            case AnchorMatch.FIRST:
+                return (start + int(rows[0]), int(cols[0]))
+            case AnchorMatch.LAST:
+                return (start + int(rows[-1]), int(cols[-1]))
+            case _:
+                matches.extend(
+                    (start + int(row), int(col)) for row, col in zip(rows, cols)
+                )
+
+    if not matches:
+        raise ValueError(f"anchor {anchor!r} not found in the first {n_rows} rows")
+    if len(matches) > 1:
+        shown = ", ".join(str(match) for match in matches[:10])
+        more = f" and {len(matches) - 10} more" if len(matches) > 10 else ""
+        raise ValueError(
+            f"anchor {anchor!r} found {len(matches)} times at (row, column) {shown}{more}"
+        )
+    return matches[0]
 
 
 def extract_table(
@@ -32,3 +94,66 @@ def extract_table(
         # Increment starting row since first row is used for headers
         start_row = start_row + 1
     return df.iloc[start_row:, start_col:].set_axis(headers, axis=1)
+
+
+def read_anchored_xlsx(
+    file_path: str,
+    anchor: str,
+    sheet_name: str | int = 0,
+    max_search_rows: int | None = None,
+) -> Tuple[pd.DataFrame, list[tuple]]:
+    """
+    Stream an XLSX sheet and return the table starting at the anchor cell
+
+    The sheet is read row by row in openpyxl read-only mode. Rows before the
+    anchor row (the preamble) are kept as plain tuples, and only the rows
+    from the anchor onward are turned into a Dataframe, so memory scales with
+    the table instead of the whole sheet and the workbook is parsed once.
+
+    Parameters
+    ----------
+    file_path:
+        The XLSX file to be read
+    anchor:
+        Value of the cell marking the top left corner of the table
+    sheet_name: default 0
+        Name or position of the sheet to be read
+    max_search_rows: default None
+        If supplied, stop looking for the anchor after this many rows
+
+    Returns
+    -------
+    A tuple of the table, without headers and with the anchor at position
+    (0, 0), and the list of preamble rows
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if isinstance(sheet_name, int):
+            sheet = workbook.worksheets[sheet_name]
+        else:
+            sheet = workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+
+        preamble: list[tuple] = []
+        for row in rows:
+            if anchor in row:
+                anchor_col = row.index(anchor)
+                break
+            preamble.append(row)
+            if max_search_rows is not None and len(preamble) >= max_search_rows:
+                raise ValueError(
+                    f"anchor {anchor!r} not found in the first {max_search_rows} rows of {file_path}"
+                )
+        else:
+            raise ValueError(f"anchor {anchor!r} not found in {file_path}")
+
+        table_rows = [row[anchor_col:]]
+        table_rows.extend(_row[anchor_col:] for _row in rows)
+    finally:
+        # read-only workbooks keep the file open until closed
+        workbook.close()
+
+    # drop trailing empty rows, the same way pandas.read_excel does
+    while len(table_rows) > 1 and all(cell is None for cell in table_rows[-1]):
+        table_rows.pop()
+    return pd.DataFrame(table_rows), preamble